@@ -11,17 +11,203 @@ that can be caught by the calling code to fall back to other TTS providers.
 
 import os
 import json
+import asyncio
 import base64
+import binascii
+import hashlib
 import logging
+import struct
+import threading
 import time
-from typing import Optional, Dict, Any, Tuple
+import weakref
+from json.encoder import encode_basestring_ascii
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, List, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+
+# Optional async HTTP client for agenerate_audio
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Optional fast JSON codec, falls back to the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+class _SharedToken:
+    """
+    OAuth token shared by every generator using one set of credentials.
+    
+    The (token, expiry) pair is replaced as a whole so readers never need
+    the lock; token requests are serialized by it. Expiry times are
+    time.monotonic() values, immune to wall-clock jumps.
+    """
+    
+    def __init__(self):
+        self.state: Tuple[Optional[str], float] = (None, 0.0)
+        self.lock = threading.Lock()
+        # Live generators with these credentials; the refresher stops once
+        # the last one is closed or collected
+        self.users = weakref.WeakSet()
+        self.refresher: Optional[threading.Thread] = None
+        self.wakeup = threading.Event()
+
+
+# Process-wide OAuth tokens keyed by a hash of the client credentials, so
+# generator instances sharing credentials share one token and one refresher
+_TOKEN_CACHE: Dict[str, _SharedToken] = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def _json_loads(content: bytes) -> Any:
+    """Parse a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Serialize a request body as JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+def _json_string(value: str) -> bytes:
+    """Serialize a string as a JSON string literal."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return encode_basestring_ascii(value).encode("ascii")
+
+
+# Index of the payload shape that last succeeded, keyed by API URL, so
+# later calls skip shapes the endpoint is known to reject
+_PREFERRED_PAYLOAD: Dict[str, int] = {}
+
+# Likewise for batch requests: the accepted batch shape per API URL, or
+# _NO_BATCH once every shape has been rejected there
+_BATCH_PAYLOAD: Dict[str, int] = {}
+_NO_BATCH = -1
+
+
+def _wav_duration(audio_bytes: bytes) -> Optional[float]:
+    """
+    Read the duration of WAV audio from its RIFF header.
+    
+    Args:
+        audio_bytes: Encoded audio
+        
+    Returns:
+        Duration in seconds, or None if the audio is not a readable WAV
+    """
+    if len(audio_bytes) < 12 or audio_bytes[:4] != b"RIFF" or audio_bytes[8:12] != b"WAVE":
+        return None
+    
+    # Walk the chunks for the byte rate (fmt) and the PCM payload size (data)
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(audio_bytes):
+        chunk_id = audio_bytes[offset:offset + 4]
+        chunk_size, = struct.unpack_from("<I", audio_bytes, offset + 4)
+        if chunk_id == b"fmt " and offset + 20 <= len(audio_bytes):
+            byte_rate, = struct.unpack_from("<I", audio_bytes, offset + 16)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed WAVs may leave the size unset; use what we received
+            data_size = min(chunk_size, len(audio_bytes) - offset - 8)
+            return data_size / byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _credentials_key(client_id: str, client_secret: str) -> str:
+    """Hash OAuth credentials into a token cache key."""
+    return hashlib.sha256(f"{client_id}:{client_secret}".encode()).hexdigest()
+
+
+# Result of the last availability probe per (API URL, credentials), as
+# (monotonic timestamp, available), so short-lived generators don't re-probe
+_AVAILABILITY_CACHE: Dict[str, Tuple[float, bool]] = {}
+
+
+def _availability_key(api_url: str, client_id: Optional[str],
+                      client_secret: Optional[str], api_key: Optional[str]) -> str:
+    """Hash the endpoint and credentials into an availability cache key."""
+    return hashlib.sha256(f"{api_url}|{client_id}:{client_secret}|{api_key}".encode()).hexdigest()
+
+
+def _shared_token(key: str) -> _SharedToken:
+    """Get or create the shared token entry for a credentials key."""
+    with _TOKEN_CACHE_LOCK:
+        shared = _TOKEN_CACHE.get(key)
+        if shared is None:
+            shared = _TOKEN_CACHE[key] = _SharedToken()
+        return shared
+
+
+def _start_token_refresher(shared: _SharedToken) -> None:
+    """Start the refresh thread for a set of credentials if it is not running."""
+    if shared.refresher is not None:
+        return
+    with _TOKEN_CACHE_LOCK:
+        if shared.refresher is None:
+            shared.refresher = threading.Thread(
+                target=_token_refresh_loop,
+                args=(shared,),
+                name="datacrunch-token-refresh",
+                daemon=True
+            )
+            shared.refresher.start()
+
+
+def _token_refresh_loop(shared: _SharedToken) -> None:
+    """
+    Roll a shared OAuth token over shortly before it expires.
+    
+    One loop runs per set of credentials, however many generators use
+    them. It holds no generator between refreshes, borrowing any live one
+    for the request itself, and ends when the last generator goes away.
+    """
+    try:
+        while True:
+            remaining = shared.state[1] - time.monotonic()
+            delay = max(remaining - DataCrunchGenerator.TOKEN_REFRESH_MARGIN, remaining / 2, 1.0)
+            shared.wakeup.wait(delay)
+            shared.wakeup.clear()
+            
+            generator = next(iter(list(shared.users)), None)
+            if generator is None:
+                return
+            if shared.state[1] - time.monotonic() > DataCrunchGenerator.TOKEN_REFRESH_MARGIN:
+                # Woken early, e.g. by a generator closing; nothing is due
+                continue
+            
+            try:
+                with shared.lock:
+                    generator._refresh_token_locked()
+            except (ValueError, RequestException) as e:
+                logger.warning(f"Background OAuth token refresh failed: {str(e)}")
+                generator = None
+                # Back off before retrying; requests will refresh inline if needed
+                shared.wakeup.wait(30)
+            generator = None
+    finally:
+        with _TOKEN_CACHE_LOCK:
+            shared.refresher = None
+
+
 class DataCrunchGenerator:
     """
     DataCrunch text-to-speech generator that uses the DataCrunch API
@@ -34,12 +220,19 @@ class DataCrunchGenerator:
     TOKEN_ENDPOINT = "https://api.datacrunch.io/v1/oauth2/token"
     TTS_ENDPOINT_BASE = "https://api.datacrunch.io"
     TTS_ENDPOINT_PATH = "/inference/tts"  # Most promising endpoint from testing
+    USER_AGENT = "SesameAI-DataCrunch-Client/1.0"
+    TOKEN_REFRESH_MARGIN = 300  # Refresh in the background 5 minutes before expiry
+    TOKEN_MAX_TTL = 3300  # Never trust a token for more than 55 minutes
+    AVAILABILITY_TTL = 300  # Seconds a probe result is shared between instances
+    # Key paths under which responses have been seen to carry the audio
+    AUDIO_PATHS = (("audio_data",), ("audio",), ("data", "audio_data"), ("result", "audio_data"))
     
     def __init__(self, 
                  client_id: Optional[str] = None, 
                  client_secret: Optional[str] = None,
                  api_key: Optional[str] = None,
-                 api_url: Optional[str] = None):
+                 api_url: Optional[str] = None,
+                 prefetch: bool = True):
         """
         Initialize the DataCrunch generator.
         
@@ -48,6 +241,8 @@ class DataCrunchGenerator:
             client_secret: OAuth client secret, defaults to env var DATACRUNCH_CLIENT_SECRET
             api_key: DataCrunch API key, defaults to env var DATACRUNCH_API_KEY
             api_url: DataCrunch API URL, defaults to env var DATACRUNCH_URL
+            prefetch: Authenticate in a background thread right away, so the
+                connection pool and token are warm by the first request
         """
         # Get credentials from arguments or environment
         self.client_id = client_id or os.getenv("DATACRUNCH_CLIENT_ID")
@@ -61,20 +256,92 @@ class DataCrunchGenerator:
         if self.api_url and not self.api_url.startswith(("http://", "https://")):
             self.api_url = f"https://{self.api_url}"
             
-        # OAuth token storage
-        self.access_token = None
-        self.token_expiry = 0
+        # OAuth token, shared with other generators using the same credentials
+        self._shared_token: Optional[_SharedToken] = None
+        if self.client_id and self.client_secret:
+            self._shared_token = _shared_token(_credentials_key(self.client_id, self.client_secret))
+            self._shared_token.users.add(self)
+        # (event loop, httpx.AsyncClient); a client only works on the loop it was made on
+        self._async_client = None
+        self._payload_templates: Dict[Tuple[str, str], List[bytes]] = {}
+        
+        # Auth headers built for the current token, rebuilt only when it rolls
+        self._cached_headers: Tuple[Optional[str], Dict[str, str]] = (None, {})
+        
+        # Persistent HTTP session so the OAuth, probe and TTS calls reuse
+        # pooled keep-alive connections instead of a new TLS handshake each
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            # Transient failures are retried here, on the same pooled connection,
+            # honouring Retry-After; the payload loop only probes request shapes
+            max_retries=Retry(
+                total=3,
+                connect=2,
+                read=2,
+                backoff_factor=0.3,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"]),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        ))
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            # Prefer raw audio over base64-wrapped JSON (a third smaller,
+            # and nothing to decode)
+            "Accept": "audio/wav, application/json;q=0.9",
+            "User-Agent": self.USER_AGENT
+        })
+        
+        # Result of the background availability probe; None until it finishes.
+        # Results older than AVAILABILITY_TTL are checked again on use.
+        self.remote_available: Optional[bool] = None
+        self._availability_checked = 0.0
         
         # Check if we have valid credentials
         if not (self.client_id and self.client_secret) and not self.api_key:
             logger.warning("DataCrunch credentials not found. Either OAuth credentials "
                           "(DATACRUNCH_CLIENT_ID and DATACRUNCH_CLIENT_SECRET) or "
                           "direct API key (DATACRUNCH_API_KEY) is required.")
+            self.remote_available = False
+        else:
+            # Reuse a recent probe result from another instance
+            self._read_availability_cache()
+        
+        if self.remote_available is None and prefetch:
+            # Probe off the constructor's critical path
+            threading.Thread(
+                target=self._probe_remote,
+                name="datacrunch-probe",
+                daemon=True
+            ).start()
+    
+    @property
+    def _token_state(self) -> Tuple[Optional[str], float]:
+        """The shared (token, expiry) pair for these credentials."""
+        if self._shared_token is None:
+            return (None, 0.0)
+        return self._shared_token.state
+    
+    @property
+    def access_token(self) -> Optional[str]:
+        """The current OAuth access token, if any."""
+        return self._token_state[0]
+    
+    @property
+    def token_expiry(self) -> float:
+        """time.monotonic() value at which the current OAuth token expires."""
+        return self._token_state[1]
     
     def _get_oauth_token(self) -> str:
         """
         Get OAuth token using client credentials flow.
         
+        The token is normally rolled over by a background thread before it
+        expires; refreshing inline here only happens if that thread missed.
+        
         Returns:
             str: The access token
             
@@ -82,14 +349,36 @@ class DataCrunchGenerator:
             ValueError: If OAuth credentials are missing
             RequestException: If token request fails
         """
-        # Check if we already have a valid token
-        if self.access_token and time.time() < self.token_expiry - 60:
-            return self.access_token
-            
         # Verify credentials
-        if not self.client_id or not self.client_secret:
+        shared = self._shared_token
+        if shared is None:
             raise ValueError("OAuth client ID and secret are required")
+        
+        # Check if we (or another instance) already have a valid token
+        token, expiry = shared.state
+        if token and time.monotonic() < expiry - 60:
+            return token
+        
+        with shared.lock:
+            # Another thread may have refreshed while we waited for the lock
+            token, expiry = shared.state
+            if not (token and time.monotonic() < expiry - 60):
+                token = self._refresh_token_locked()
+        
+        _start_token_refresher(shared)
+        return token
+    
+    def _refresh_token_locked(self) -> str:
+        """
+        Request a new OAuth token. Must be called with the shared token's lock held.
+        
+        Returns:
+            str: The new access token
             
+        Raises:
+            ValueError: If the response does not contain a token
+            RequestException: If token request fails
+        """
         # Prepare request
         payload = {
             "grant_type": "client_credentials",
@@ -97,57 +386,83 @@ class DataCrunchGenerator:
             "client_secret": self.client_secret
         }
         
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
         # Make request
         try:
             logger.debug("Requesting OAuth token from DataCrunch")
-            response = requests.post(
+            response = self.session.post(
                 self.TOKEN_ENDPOINT, 
-                json=payload, 
-                headers=headers,
+                data=_json_dumps(payload), 
+                headers={"Accept": "application/json"},
                 timeout=10
             )
             
             # Check response
             response.raise_for_status()
-            data = response.json()
+            data = _json_loads(response.content)
             
             # Extract token and expiry
             if "access_token" not in data:
                 raise ValueError("DataCrunch OAuth response missing access_token")
                 
-            self.access_token = data["access_token"]
             expires_in = data.get("expires_in", 600)  # Default 10 minutes
-            self.token_expiry = time.time() + expires_in
+            ttl = min(expires_in, self.TOKEN_MAX_TTL)
+            self._shared_token.state = (data["access_token"], time.monotonic() + ttl)
             
             logger.debug(f"OAuth token obtained, expires in {expires_in} seconds")
-            return self.access_token
+            return data["access_token"]
             
         except RequestException as e:
             logger.error(f"Failed to get DataCrunch OAuth token: {str(e)}")
             raise
     
+    @classmethod
+    def invalidate_token_cache(cls,
+                               client_id: Optional[str] = None,
+                               client_secret: Optional[str] = None) -> None:
+        """
+        Forget cached OAuth tokens, e.g. after the API rejected one with a 401.
+        
+        Every generator using the affected credentials requests a fresh
+        token on its next call.
+        
+        Args:
+            client_id: OAuth client ID whose token to drop; drops all if omitted
+            client_secret: OAuth client secret matching client_id
+        """
+        with _TOKEN_CACHE_LOCK:
+            if client_id and client_secret:
+                entries = [_TOKEN_CACHE.get(_credentials_key(client_id, client_secret))]
+            else:
+                entries = list(_TOKEN_CACHE.values())
+        for shared in entries:
+            if shared is not None:
+                shared.state = (None, 0.0)
+    
+    def _invalidate_token(self) -> None:
+        """Drop this generator's OAuth token after the API rejected it."""
+        if self._shared_token is not None:
+            self.invalidate_token_cache(self.client_id, self.client_secret)
+        self._cached_headers = (None, {})
+    
     def _get_auth_headers(self) -> Dict[str, str]:
         """
         Get authentication headers for API requests.
         Tries OAuth first, then falls back to API key if OAuth fails.
         
+        Content-Type, Accept and User-Agent are set once on the session,
+        so only the authentication headers are returned here. The dict is
+        cached per token and shared between calls; copy it before modifying.
+        
         Returns:
-            Dict[str, str]: Headers including authentication
+            Dict[str, str]: Authentication headers
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
         # Try OAuth authentication first
         try:
             token = self._get_oauth_token()
-            headers["Authorization"] = f"Bearer {token}"
+            cached_token, headers = self._cached_headers
+            if token != cached_token:
+                headers = {"Authorization": f"Bearer {token}"}
+                self._cached_headers = (token, headers)
             return headers
         except (ValueError, RequestException) as e:
             logger.warning(f"OAuth authentication failed: {str(e)}")
@@ -155,10 +470,15 @@ class DataCrunchGenerator:
             # Fall back to API key if available
             if self.api_key:
                 logger.debug("Falling back to API key authentication")
-                # Try multiple header formats since we don't know which one is correct
-                headers["X-API-KEY"] = self.api_key
-                headers["x-api-key"] = self.api_key
-                headers["Authorization"] = f"Bearer {self.api_key}"
+                cached_token, headers = self._cached_headers
+                if cached_token != self.api_key:
+                    # Try multiple header formats since we don't know which one is correct
+                    headers = {
+                        "X-API-KEY": self.api_key,
+                        "x-api-key": self.api_key,
+                        "Authorization": f"Bearer {self.api_key}"
+                    }
+                    self._cached_headers = (self.api_key, headers)
                 return headers
             else:
                 # Re-raise the original exception if we can't authenticate
@@ -193,69 +513,295 @@ class DataCrunchGenerator:
             logger.error(f"Authentication failed: {str(e)}")
             raise ValueError(f"DataCrunch authentication failed: {str(e)}")
         
-        # Prepare TTS request payload
-        # Try both with and without model_id
-        payloads = [
-            {
-                "text": text,
-                "voice_id": voice
-            },
-            {
-                "text": text,
-                "voice_id": voice,
-                "model_id": model
-            }
-        ]
+        payloads = self._build_payloads(text, voice, model)
         
         # Generate URL
-        tts_url = f"{self.api_url}{self.TTS_ENDPOINT_PATH}"
+        tts_url = self._tts_url
         logger.debug(f"Using TTS URL: {tts_url}")
         
-        # Try each payload
-        last_error = None
-        for payload in payloads:
+        # Try each payload shape until the endpoint accepts one
+        for shape, payload in payloads:
             try:
-                logger.debug(f"Requesting speech synthesis with payload: {json.dumps(payload)}")
-                response = requests.post(
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Requesting speech synthesis with payload: {payload.decode()}")
+                response = self.session.post(
                     tts_url,
-                    json=payload,
+                    data=payload,
                     headers=headers,
                     timeout=30  # Speech generation can take time
                 )
-                
-                # Check response
-                if response.status_code == 200:
-                    return self._process_success_response(response)
-                elif response.status_code == 401:
-                    logger.warning("DataCrunch API returned 401 Unauthorized")
-                    response_data = response.json() if response.content else {"error": "Unauthorized"}
-                    raise ValueError(f"DataCrunch API authorization error: {response_data}")
-                elif response.status_code == 404:
-                    logger.warning(f"DataCrunch API endpoint not found: {tts_url}")
-                    continue  # Try next payload
-                else:
-                    logger.warning(f"DataCrunch API returned status {response.status_code}")
-                    response_data = response.json() if response.content else {"error": f"HTTP {response.status_code}"}
-                    last_error = ValueError(f"DataCrunch API error: {response_data}")
-                    continue  # Try next payload
-                    
             except RequestException as e:
                 logger.error(f"DataCrunch API request failed: {str(e)}")
-                last_error = e
-                continue  # Try next payload
+                raise
+            
+            # Check response
+            result = self._handle_tts_response(response, tts_url)
+            if result is not None:
+                _PREFERRED_PAYLOAD[self.api_url] = shape
+                return result
+        
+        # If we get here, every payload shape was rejected
+        raise ValueError("DataCrunch TTS API returned no valid response")
+    
+    async def agenerate_audio(self,
+                              text: str,
+                              voice: str = DEFAULT_VOICE,
+                              model: str = DEFAULT_MODEL) -> Tuple[bytes, float]:
+        """
+        Generate audio from text without blocking the event loop.
+        
+        Uses a pooled httpx.AsyncClient (HTTP/2 when available) so many
+        requests can be in flight on one connection. Without httpx installed
+        the blocking generate_audio runs in a worker thread instead.
+        
+        To synthesize several sentences concurrently, use agenerate_many.
+        
+        Args:
+            text: The text to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (default: tts1)
+            
+        Returns:
+            Tuple[bytes, float]: Audio data as bytes and duration in seconds
+            
+        Raises:
+            ValueError: If there's an issue with the request or response
+        """
+        if httpx is None:
+            return await asyncio.to_thread(self.generate_audio, text, voice, model)
+        
+        if not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        # Get authentication headers
+        try:
+            headers = await self._aget_auth_headers()
+        except (ValueError, RequestException) as e:
+            logger.error(f"Authentication failed: {str(e)}")
+            raise ValueError(f"DataCrunch authentication failed: {str(e)}")
+        
+        client = self._get_async_client()
+        tts_url = self._tts_url
+        
+        # Try each payload shape until the endpoint accepts one
+        for shape, payload in self._build_payloads(text, voice, model):
+            try:
+                response = await client.post(tts_url, content=payload, headers=headers)
+            except httpx.HTTPError as e:
+                logger.error(f"DataCrunch API request failed: {str(e)}")
+                raise
+            
+            # Check response
+            result = self._handle_tts_response(response, tts_url)
+            if result is not None:
+                _PREFERRED_PAYLOAD[self.api_url] = shape
+                return result
+        
+        # If we get here, every payload shape was rejected
+        raise ValueError("DataCrunch TTS API returned no valid response")
+    
+    async def agenerate_many(self,
+                             texts: List[str],
+                             voice: str = DEFAULT_VOICE,
+                             model: str = DEFAULT_MODEL) -> List[Tuple[bytes, float]]:
+        """
+        Generate audio for several texts concurrently.
+        
+        All requests share the pooled async client, so with HTTP/2 they are
+        multiplexed over a single connection.
+        
+        Args:
+            texts: The texts to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (default: tts1)
+            
+        Returns:
+            List[Tuple[bytes, float]]: Audio data and duration for each text, in order
+            
+        Raises:
+            ValueError: If there's an issue with any request or response
+        """
+        return list(await asyncio.gather(
+            *(self.agenerate_audio(text, voice, model) for text in texts)
+        ))
+    
+    def generate_many(self,
+                      texts: List[str],
+                      voice: str = DEFAULT_VOICE,
+                      model: str = DEFAULT_MODEL) -> List[Tuple[bytes, float]]:
+        """
+        Synchronous wrapper around agenerate_many for callers without an event loop.
+        
+        Args:
+            texts: The texts to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (default: tts1)
+            
+        Returns:
+            List[Tuple[bytes, float]]: Audio data and duration for each text, in order
+        """
+        async def run():
+            try:
+                return await self.agenerate_many(texts, voice, model)
+            finally:
+                # The async client is bound to this event loop, which
+                # asyncio.run closes on return
+                await self._aclose_async_client()
+        
+        return asyncio.run(run())
+    
+    def _get_async_client(self):
+        """
+        Return the pooled async HTTP client for the running event loop.
         
-        # If we get here, all payloads failed
-        if last_error:
-            raise last_error
+        A client made on an earlier loop (e.g. a previous asyncio.run) is
+        closed and replaced rather than reused.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client[0] is not loop:
+            self._close_async_client()
+        
+        if self._async_client is None:
+            options = dict(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30,
+                headers=dict(self.session.headers)
+            )
+            try:
+                client = httpx.AsyncClient(http2=True, **options)
+            except ImportError:
+                # HTTP/2 support needs the optional h2 package
+                client = httpx.AsyncClient(**options)
+            self._async_client = (loop, client)
+        return self._async_client[1]
+    
+    async def _aclose_async_client(self) -> None:
+        """Close the async client if it belongs to the running event loop."""
+        if self._async_client is not None and self._async_client[0] is asyncio.get_running_loop():
+            client = self._async_client[1]
+            self._async_client = None
+            await client.aclose()
         else:
-            raise ValueError("DataCrunch TTS API returned no valid response")
+            self._close_async_client()
     
-    def _process_success_response(self, response: requests.Response) -> Tuple[bytes, float]:
+    def _close_async_client(self) -> None:
+        """Close the async client from synchronous code, on its own event loop."""
+        entry = getattr(self, "_async_client", None)
+        self._async_client = None
+        if entry is None:
+            return
+        
+        loop, client = entry
+        if loop.is_closed():
+            # Its transports were torn down with the loop
+            return
+        try:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+        except RuntimeError as e:
+            # e.g. another event loop is running in this thread
+            logger.debug(f"Could not close async DataCrunch client: {str(e)}")
+    
+    async def _aget_auth_headers(self) -> Dict[str, str]:
         """
-        Process a successful API response to extract audio data.
+        Async counterpart of _get_auth_headers.
+        
+        A valid shared token is used directly. Otherwise the sync path runs
+        in a worker thread, so token requests go through the same shared
+        cache and lock and are not duplicated across sync and async callers.
+        
+        Returns:
+            Dict[str, str]: Authentication headers
+        """
+        token, expiry = self._token_state
+        if token and time.monotonic() < expiry - 60:
+            cached_token, headers = self._cached_headers
+            if token != cached_token:
+                headers = {"Authorization": f"Bearer {token}"}
+                self._cached_headers = (token, headers)
+            return headers
+        
+        return await asyncio.to_thread(self._get_auth_headers)
+    
+    @property
+    def _tts_url(self) -> str:
+        """Full URL of the TTS endpoint."""
+        return f"{self.api_url}{self.TTS_ENDPOINT_PATH}"
+    
+    def _build_payloads(self, text: str, voice: str, model: str) -> List[Tuple[int, bytes]]:
+        """
+        Build the serialized TTS request bodies to try, in order.
+        
+        The endpoint's exact schema is unknown, so try both with and
+        without model_id, starting with whichever shape last succeeded
+        against this API URL. The voice/model part of each body is
+        serialized once per (voice, model) and only the text is encoded
+        per call.
+        
+        Returns:
+            List of (shape index, request body) pairs
+        """
+        templates = self._payload_templates.get((voice, model))
+        if templates is None:
+            voice_json = _json_string(voice)
+            model_json = _json_string(model)
+            templates = [
+                b'{"voice_id":' + voice_json + b',"text":',
+                b'{"voice_id":' + voice_json + b',"model_id":' + model_json + b',"text":'
+            ]
+            self._payload_templates[(voice, model)] = templates
+        
+        text_json = _json_string(text)
+        payloads = [(shape, prefix + text_json + b"}") for shape, prefix in enumerate(templates)]
+        
+        preferred = _PREFERRED_PAYLOAD.get(self.api_url)
+        if preferred:
+            payloads.insert(0, payloads.pop(preferred))
+        return payloads
+    
+    def _handle_tts_response(self, response, tts_url: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Interpret a TTS response from either the sync or async client.
         
         Args:
             response: The API response
+            tts_url: The URL that was requested, for logging
+            
+        Returns:
+            The audio result, or None if the endpoint rejected the payload
+            shape and the next one should be tried
+            
+        Raises:
+            ValueError: If the API rejected our credentials or failed
+        """
+        if response.status_code == 200:
+            return self._process_success_response(response)
+        elif response.status_code == 401:
+            logger.warning("DataCrunch API returned 401 Unauthorized")
+            # The next call requests a new token instead of resending this one
+            self._invalidate_token()
+            response_data = _json_loads(response.content) if response.content else {"error": "Unauthorized"}
+            raise ValueError(f"DataCrunch API authorization error: {response_data}")
+        elif response.status_code == 404:
+            logger.warning(f"DataCrunch API endpoint not found: {tts_url}")
+            return None  # Try next payload
+        elif response.status_code in (400, 422):
+            logger.warning(f"DataCrunch API rejected payload with status {response.status_code}")
+            return None  # Try next payload
+        else:
+            # Transient statuses were already retried by the session adapter
+            logger.warning(f"DataCrunch API returned status {response.status_code}")
+            response_data = _json_loads(response.content) if response.content else {"error": f"HTTP {response.status_code}"}
+            raise ValueError(f"DataCrunch API error: {response_data}")
+    
+    def _process_success_response(self, response) -> Tuple[bytes, float]:
+        """
+        Process a successful API response to extract audio data.
+        
+        Args:
+            response: The API response (requests or httpx)
             
         Returns:
             Tuple[bytes, float]: Audio data as bytes and duration in seconds
@@ -263,38 +809,264 @@ class DataCrunchGenerator:
         Raises:
             ValueError: If the response doesn't contain valid audio data
         """
+        # Raw audio body, returned when the endpoint honours our Accept header
+        if response.headers.get("Content-Type", "").startswith("audio/"):
+            audio_bytes = response.content
+            duration = _wav_duration(audio_bytes)
+            if duration is None:
+                duration = len(audio_bytes) / 32000
+            return audio_bytes, duration
+        
         try:
-            data = response.json()
+            return self._decode_audio_payload(_json_loads(response.content))
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to process DataCrunch response: {str(e)}")
+            raise ValueError(f"Invalid response format from DataCrunch API: {str(e)}")
+    
+    def _decode_audio_payload(self, data: Any) -> Tuple[bytes, float]:
+        """
+        Extract and decode the audio from one parsed response item.
+        
+        Args:
+            data: Parsed JSON response (or one item of a batch response)
             
-            # Extract audio data from various possible response formats
-            audio_data = None
-            if isinstance(data, dict):
-                # Try different key patterns
-                audio_data = (
-                    data.get("audio_data") or
-                    data.get("audio") or
-                    (data.get("data", {}) or {}).get("audio_data") or
-                    (data.get("result", {}) or {}).get("audio_data")
-                )
-            elif isinstance(data, str) and data.startswith("data:audio"):
-                # Handle data URI format
-                audio_data = data.split(",")[1]
+        Returns:
+            Tuple[bytes, float]: Audio data as bytes and duration in seconds
             
-            if not audio_data:
-                raise ValueError(f"No audio data found in response: {json.dumps(data)}")
+        Raises:
+            ValueError: If the item doesn't contain valid audio data
+        """
+        audio_data = self._find_audio_data(data)
+            
+        # Decode base64 audio data. a2b_base64 reads ASCII str and bytes
+        # directly, so the multi-MB payload isn't first copied by .encode()
+        try:
+            audio_bytes = binascii.a2b_base64(audio_data)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 audio data: {str(e)}")
+        
+        # Read the duration from the WAV header; for other formats
+        # estimate ~32KB per second of audio as a rough guide
+        duration = _wav_duration(audio_bytes)
+        if duration is None:
+            duration = len(audio_bytes) / 32000
+        
+        return audio_bytes, duration
+    
+    def _find_audio_data(self, data: Any) -> Union[str, bytes]:
+        """
+        Locate the base64 audio string in a parsed response.
+        
+        Raises:
+            ValueError: If the response doesn't contain audio data
+        """
+        # Extract audio data from various possible response formats
+        audio_data = None
+        if isinstance(data, dict):
+            # Try different key patterns, stopping at the first hit
+            for path in self.AUDIO_PATHS:
+                value = data
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if value:
+                    audio_data = value
+                    break
+        elif isinstance(data, str) and data.startswith("data:audio"):
+            # Handle data URI format
+            audio_data = data[data.index(",") + 1:]
+        
+        if not audio_data:
+            raise ValueError(f"No audio data found in response: {json.dumps(data)}")
+        
+        return audio_data
+    
+    def generate_audio_stream(self,
+                              text: str,
+                              voice: str = DEFAULT_VOICE,
+                              model: str = DEFAULT_MODEL,
+                              chunk_size: int = 16384) -> Iterator[bytes]:
+        """
+        Generate audio from text, yielding it in chunks as it arrives.
+        
+        Raw audio responses are passed through as they are downloaded, so
+        playback can start before synthesis of the whole clip is received.
+        When the server can only answer with base64 JSON, the audio is
+        decoded and yielded piecewise.
+        
+        Args:
+            text: The text to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (default: tts1)
+            chunk_size: Size in bytes of the yielded chunks
+            
+        Yields:
+            bytes: Consecutive chunks of audio data
+            
+        Raises:
+            ValueError: If there's an issue with the request or response
+            RequestException: If the API request fails
+        """
+        if not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        try:
+            headers = self._get_auth_headers()
+        except (ValueError, RequestException) as e:
+            logger.error(f"Authentication failed: {str(e)}")
+            raise ValueError(f"DataCrunch authentication failed: {str(e)}")
+        headers = {**headers, "Accept": "audio/*, application/json;q=0.5"}
+        
+        tts_url = self._tts_url
+        for shape, payload in self._build_payloads(text, voice, model):
+            with self.session.post(tts_url, data=payload, headers=headers, stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    self._handle_tts_response(response, tts_url)
+                    continue  # Payload shape rejected, try the next one
+                
+                _PREFERRED_PAYLOAD[self.api_url] = shape
+                if response.headers.get("Content-Type", "").startswith("audio/"):
+                    yield from response.iter_content(chunk_size=chunk_size)
+                    return
                 
-            # Decode base64 audio data
-            audio_bytes = base64.b64decode(audio_data)
+                # JSON-wrapped base64: decode in 4-character aligned slices
+                audio_data = self._find_audio_data(_json_loads(response.content))
+                step = chunk_size // 3 * 4
+                for start in range(0, len(audio_data), step):
+                    yield base64.b64decode(audio_data[start:start + step], validate=False)
+                return
+        
+        raise ValueError("DataCrunch TTS API returned no valid response")
+    
+    def generate_audio_batch(self,
+                             texts: List[str],
+                             voice: str = DEFAULT_VOICE,
+                             model: str = DEFAULT_MODEL) -> List[Tuple[bytes, float]]:
+        """
+        Generate audio for several texts, batching them when the API allows.
+        
+        All texts are first sent in a single request so the server can batch
+        them on the model. If the endpoint rejects batched input, the texts
+        are synthesized concurrently over the shared session instead.
+        
+        Args:
+            texts: The texts to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (default: tts1)
             
-            # We don't have duration info, so estimate based on audio size
-            # Assuming WAV format, ~32KB per second of audio as rough estimate
-            estimated_duration = len(audio_bytes) / 32000
+        Returns:
+            List[Tuple[bytes, float]]: Audio data and duration for each text, in order
             
-            return audio_bytes, estimated_duration
+        Raises:
+            ValueError: If there's an issue with the request or response
+            RequestException: If the API request fails
+        """
+        if not texts:
+            return []
+        if any(not text.strip() for text in texts):
+            raise ValueError("Text cannot be empty")
+        
+        try:
+            results = self._generate_batched(texts, voice, model)
+            if results is not None:
+                return results
+        except (ValueError, RequestException) as e:
+            logger.warning(f"Batched DataCrunch request failed, generating individually: {str(e)}")
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(texts))) as executor:
+            return list(executor.map(lambda text: self.generate_audio(text, voice, model), texts))
+    
+    def _generate_batched(self, texts: List[str], voice: str, model: str) -> Optional[List[Tuple[bytes, float]]]:
+        """
+        Send all texts in one request.
+        
+        Returns:
+            The decoded results, or None if the server doesn't accept batches
             
-        except (ValueError, KeyError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to process DataCrunch response: {str(e)}")
-            raise ValueError(f"Invalid response format from DataCrunch API: {str(e)}")
+        Raises:
+            ValueError: If the API rejected our credentials or failed
+        """
+        preferred = _BATCH_PAYLOAD.get(self.api_url)
+        if preferred == _NO_BATCH:
+            return None
+        
+        # Batch results only come back as JSON
+        headers = {**self._get_auth_headers(), "Accept": "application/json"}
+        tts_url = self._tts_url
+        
+        # Try the per-item "inputs" schema first, then a flat texts list
+        # both with and without model_id, as for single requests, starting
+        # with whichever shape last succeeded against this API URL
+        payloads = list(enumerate([
+            {"inputs": [{"text": text, "voice_id": voice} for text in texts], "model_id": model},
+            {"texts": texts, "voice_id": voice},
+            {"texts": texts, "voice_id": voice, "model_id": model}
+        ]))
+        if preferred:
+            payloads.insert(0, payloads.pop(preferred))
+        
+        for shape, payload in payloads:
+            response = self.session.post(tts_url, data=_json_dumps(payload), headers=headers, timeout=60)
+            if response.status_code != 200:
+                # Returns None for a rejected shape; raises on 401 (dropping
+                # the token) and on other errors
+                self._handle_tts_response(response, tts_url)
+                continue
+            
+            data = _json_loads(response.content)
+            if isinstance(data, dict):
+                data = data.get("results") or data.get("data") or data.get("audio")
+            if isinstance(data, list) and len(data) == len(texts):
+                _BATCH_PAYLOAD[self.api_url] = shape
+                return [self._decode_audio_payload(item) for item in data]
+            
+            logger.debug("DataCrunch batch response did not contain one result per text")
+        
+        # Don't send batches to this endpoint again
+        _BATCH_PAYLOAD[self.api_url] = _NO_BATCH
+        return None
+    
+    @property
+    def _availability_cache_key(self) -> str:
+        """Key of this endpoint and credentials in the availability cache."""
+        return _availability_key(self.api_url, self.client_id, self.client_secret, self.api_key)
+    
+    def _read_availability_cache(self) -> bool:
+        """
+        Adopt a shared probe result younger than AVAILABILITY_TTL.
+        
+        Returns:
+            bool: True if a fresh result was found
+        """
+        cached = _AVAILABILITY_CACHE.get(self._availability_cache_key)
+        if cached and time.monotonic() - cached[0] < self.AVAILABILITY_TTL:
+            self._availability_checked, self.remote_available = cached
+            return True
+        return False
+    
+    def _probe_remote(self) -> bool:
+        """Authenticate and record whether it worked."""
+        try:
+            self._get_auth_headers()
+            available = True
+        except (ValueError, RequestException) as e:
+            logger.debug(f"DataCrunch availability probe failed: {str(e)}")
+            available = False
+        
+        checked = time.monotonic()
+        _AVAILABILITY_CACHE[self._availability_cache_key] = (checked, available)
+        self._availability_checked, self.remote_available = checked, available
+        return available
+    
+    def refresh_availability(self) -> bool:
+        """
+        Re-check availability now, ignoring any cached probe result.
+        
+        Returns:
+            bool: True if the service is available, False otherwise
+        """
+        _AVAILABILITY_CACHE.pop(self._availability_cache_key, None)
+        self.remote_available = None
+        return self.is_available()
     
     def is_available(self) -> bool:
         """
@@ -306,10 +1078,42 @@ class DataCrunchGenerator:
         # We need either OAuth credentials or API key
         if not ((self.client_id and self.client_secret) or self.api_key):
             return False
+        
+        # A recent probe, ours or another instance's, already answered the
+        # question. Both outcomes expire, so an outage at startup doesn't
+        # disable DataCrunch for the rest of a long-lived process.
+        if self.remote_available is not None:
+            if time.monotonic() - self._availability_checked < self.AVAILABILITY_TTL:
+                return self.remote_available
+        if self._read_availability_cache():
+            return self.remote_available
             
-        # Try to get auth headers as a basic check
+        # Try to get auth headers as a basic check; if the probe is still
+        # running this waits on its token request instead of sending another
+        return self._probe_remote()
+    
+    def close(self) -> None:
+        """Stop sharing the token refresher and release pooled HTTP connections."""
+        self._close_async_client()
+        
+        shared = getattr(self, "_shared_token", None)
+        if shared is not None:
+            shared.users.discard(self)
+            if not shared.users:
+                # Let the refresher notice it has no generators left
+                shared.wakeup.set()
+        
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP client and the sync session."""
+        await self._aclose_async_client()
+        self.close()
+    
+    def __del__(self):
         try:
-            self._get_auth_headers()
-            return True
-        except (ValueError, RequestException):
-            return False
\ No newline at end of file
+            self.close()
+        except Exception:
+            pass
@@ -4,6 +4,7 @@ Simplified generator module to mock the Sesame AI CSM behavior
 """
 
 import os
+import functools
 import torch
 import torchaudio
 import numpy as np
@@ -13,6 +14,8 @@ class Segment:
     """
     A segment representing text or audio for the conversational speech model
     """
+    __slots__ = ("speaker", "text", "audio")
+    
     def __init__(self, speaker: int, text: str, audio: Optional[torch.Tensor] = None):
         """
         Initialize a segment
@@ -34,6 +37,22 @@ class Generator:
         """Initialize the generator"""
         self.sample_rate = 24000
 
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _sine(freq: float, sample_rate: int, n_max: int) -> np.ndarray:
+        """
+        Render a sine carrier once per (freq, sample_rate, length)
+        
+        Returns:
+            A read-only float32 buffer; callers slice it to the length they need
+        """
+        # Computed in place in a single buffer: phase, then sine
+        carrier = np.arange(n_max, dtype=np.float32)
+        carrier *= 2 * np.pi * freq / sample_rate
+        np.sin(carrier, out=carrier)
+        carrier.setflags(write=False)
+        return carrier
+
     def generate(
         self,
         text: str,
@@ -55,7 +74,7 @@ class Generator:
             topk: Top-k sampling parameter
             
         Returns:
-            A tensor containing the generated audio
+            An int16 tensor containing the generated 16-bit PCM audio
         """
         # For testing purposes, just generate a simple sine wave
         # Different frequencies for different speakers
@@ -71,17 +90,23 @@ class Generator:
         duration_s = max(1.0, min(duration_s, max_audio_length_ms / 1000))
         
         # Generate a simple sine wave
-        t = torch.linspace(0, duration_s, int(self.sample_rate * duration_s))
-        audio = torch.sin(2 * np.pi * freq * t)
+        # Built with NumPy as one contiguous float32 buffer; torch only wraps it.
+        # The carrier is cached across calls, only the noise is fresh.
+        n = int(self.sample_rate * duration_s)
+        n_max = max(n, self.sample_rate * 90)
+        carrier = self._sine(freq, self.sample_rate, n_max)[:n]
         
         # Add some noise to make it sound more natural
-        noise = torch.randn_like(audio) * 0.01
-        audio = audio + noise
+        audio = np.random.default_rng().standard_normal(n, dtype=np.float32)
+        audio *= 0.01
+        audio += carrier
         
-        # Normalize audio to be between -1 and 1
-        audio = audio / torch.max(torch.abs(audio))
+        # Normalize audio to the full 16-bit range
+        # (peak from max/min avoids allocating an abs() copy)
+        audio *= 32767.0 / max(audio.max(), -audio.min())
         
-        return audio
+        # Quantize to 16-bit PCM, the format the WAV files are written in
+        return torch.from_numpy(audio.astype(np.int16))
 
 def load_csm_1b(device: str = "cuda") -> Generator:
     """
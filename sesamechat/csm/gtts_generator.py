@@ -5,20 +5,35 @@ This module provides integration with Google's Text-to-Speech service
 through the gtts library. It's used as a fallback for DataCrunch TTS.
 """
 
+import io
 import os
+import wave
 import logging
 from typing import Optional
 from gtts import gTTS
+from gtts.lang import tts_langs
+
+# Optional in-process MP3 decoder
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Supported languages, loaded once rather than on every gTTS construction
+SUPPORTED_LANGS = tts_langs()
+
 class GttsGenerator:
     """
     Google Text-to-Speech generator that uses the gTTS library
     for voice synthesis.
     """
     
+    # Sample rate used for decoded WAV output
+    SAMPLE_RATE = 24000
+    
     def __init__(self):
         """Initialize the Google TTS generator."""
         pass
@@ -44,14 +59,36 @@ class GttsGenerator:
             raise ValueError("Text cannot be empty")
         
         try:
-            # Create gTTS object
-            tts = gTTS(text=text, lang=lang, slow=slow)
+            # Create gTTS object, skipping its language check when the
+            # cached table already knows the language
+            tts = gTTS(text=text, lang=lang, slow=slow, lang_check=lang not in SUPPORTED_LANGS)
             
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Save to file
-            tts.save(output_path)
+            # Fetch the MP3 into memory instead of a temporary file.
+            # stream() yields the audio of each ~100 character fragment in order
+            buffer = io.BytesIO()
+            for fragment in tts.stream():
+                buffer.write(fragment)
+            
+            if miniaudio is not None:
+                # Decode straight to mono PCM so output_path is a real WAV file
+                decoded = miniaudio.decode(
+                    buffer.getvalue(),
+                    output_format=miniaudio.SampleFormat.SIGNED16,
+                    nchannels=1,
+                    sample_rate=self.SAMPLE_RATE
+                )
+                with wave.open(output_path, "wb") as wav_file:
+                    wav_file.setnchannels(1)
+                    wav_file.setsampwidth(2)
+                    wav_file.setframerate(self.SAMPLE_RATE)
+                    wav_file.writeframes(decoded.samples.tobytes())
+            else:
+                # Without a decoder, save the MP3 data as gTTS returns it
+                with open(output_path, "wb") as f:
+                    f.write(buffer.getbuffer())
             
             logger.info(f"Speech generated with Google TTS and saved to {output_path}")
             return output_path
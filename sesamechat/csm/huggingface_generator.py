@@ -5,16 +5,119 @@ This module provides integration with Hugging Face's TTS models
 through their Inference API. It's used as a fallback for DataCrunch TTS.
 """
 
+import io
 import os
 import json
+import wave
+import asyncio
 import base64
 import logging
+import threading
 import requests
-from typing import Optional, Tuple
+from requests.adapters import HTTPAdapter
+from typing import Iterator, Optional, Tuple
+from urllib3.exceptions import HTTPError as Urllib3HTTPError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+# Optional async HTTP client for generate_audio_async
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Optional fast JSON codec, falls back to the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from sesamechat.csm.tts_cache import TTSCache, cache_key
+except ImportError:
+    from tts_cache import TTSCache, cache_key
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Models known to be loaded on the Inference API, shared by all instances
+_WARM_MODELS = set()
+
+
+def _read_body(response, chunk_size: int = 65536) -> bytearray:
+    """
+    Read a streamed requests response body into a single buffer.
+    
+    With a known Content-Length the body is read straight into a buffer
+    of that size, instead of collecting chunks and joining them into a
+    second full-size copy as response.content does.
+    
+    Args:
+        response: A requests response made with stream=True
+        chunk_size: Read size when the length is unknown
+        
+    Returns:
+        The response body
+        
+    Raises:
+        RequestException: If reading fails or the body is shorter than
+            its Content-Length, as requests itself would report
+    """
+    length = response.headers.get("Content-Length")
+    if length and "Content-Encoding" not in response.headers:
+        buffer = bytearray(int(length))
+        offset = 0
+        with memoryview(buffer) as view:
+            while offset < len(buffer):
+                # Map urllib3 errors the way requests' iter_content does
+                try:
+                    read = response.raw.readinto(view[offset:])
+                except ReadTimeoutError as e:
+                    raise requests.exceptions.ConnectionError(e)
+                except (Urllib3HTTPError, OSError) as e:
+                    raise requests.exceptions.ChunkedEncodingError(e)
+                if not read:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Response ended after {offset} of {len(buffer)} bytes"
+                    )
+                offset += read
+        return buffer
+    
+    # Compressed or unknown length: let requests decode, growing in place
+    buffer = bytearray()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buffer += chunk
+    return buffer
+
+
+def _audio_duration(audio_data: bytes) -> float:
+    """
+    Work out the duration of encoded audio.
+    
+    WAV headers are read with the standard library; other formats (FLAC,
+    MP3, ...) go through soundfile when it is installed. If neither can
+    read the audio, fall back to estimating ~32KB per second.
+    
+    Args:
+        audio_data: Encoded audio
+        
+    Returns:
+        Duration in seconds
+    """
+    try:
+        with wave.open(io.BytesIO(audio_data)) as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except (wave.Error, EOFError):
+        pass
+    
+    try:
+        import soundfile as sf
+        with sf.SoundFile(io.BytesIO(audio_data)) as f:
+            return f.frames / float(f.samplerate)
+    except Exception:
+        pass
+    
+    return len(audio_data) / 32000
+
 class HuggingFaceGenerator:
     """
     Hugging Face text-to-speech generator that uses the Hugging Face
@@ -26,19 +129,90 @@ class HuggingFaceGenerator:
     DEFAULT_MODEL = "facebook/mms-tts-eng"
     API_URL_BASE = "https://api-inference.huggingface.co/models/"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, warm_up: bool = False, use_cache: bool = True):
         """
         Initialize the Hugging Face generator.
         
         Args:
             api_key: Hugging Face API key, defaults to env var HUGGINGFACE_API_KEY
+            warm_up: Load the default model on the Inference API in a
+                background thread, so the first real request doesn't wait
+                for a cold start
+            use_cache: Serve repeated (text, voice, model) requests from the
+                local TTS cache
         """
         # Get API key from environment if not provided
         self.api_key = api_key or os.getenv("HUGGINGFACE_API_KEY")
         
+        # Pooled keep-alive session so repeated calls skip the TLS handshake
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                # Inference calls are POSTs, which urllib3 won't retry by default
+                allowed_methods=frozenset(["GET", "POST"])
+            )
+        ))
+        self.session.headers["Content-Type"] = "application/json"
+        
+        # (event loop, httpx.AsyncClient) for generate_audio_async, created on
+        # first use; a client only works on the loop it was made on
+        self._async_client = None
+        
+        # Local cache of generated audio
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = TTSCache()
+            except OSError as e:
+                logger.warning(f"TTS cache unavailable: {str(e)}")
+        
         # Check if we have a valid API key
         if not self.api_key:
             logger.warning("Hugging Face API key not found. Set HUGGINGFACE_API_KEY environment variable.")
+        else:
+            self.session.headers["Authorization"] = f"Bearer {self.api_key}"
+            if warm_up:
+                self.warm_up()
+    
+    def is_warm(self, model: Optional[str] = None) -> bool:
+        """Whether a warm-up request has seen the model loaded."""
+        return (model or self.DEFAULT_MODEL) in _WARM_MODELS
+    
+    def warm_up(self, model: Optional[str] = None) -> None:
+        """
+        Load a model on the Inference API in a background thread.
+        
+        Cold models answer 503 while loading, which can take tens of
+        seconds. A tiny request that waits for the model moves that delay
+        off the path of the first real request.
+        
+        Args:
+            model: The model ID to load (defaults to facebook/mms-tts-eng)
+        """
+        model_id = model or self.DEFAULT_MODEL
+        if model_id in _WARM_MODELS:
+            return
+        
+        def run():
+            try:
+                response = self.session.post(
+                    f"{self.API_URL_BASE}{model_id}",
+                    json={"inputs": " ", "options": {"wait_for_model": True}},
+                    headers={"x-wait-for-model": "true"},
+                    timeout=120
+                )
+                if response.status_code == 200:
+                    _WARM_MODELS.add(model_id)
+                    logger.debug(f"Hugging Face model warmed up: {model_id}")
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"Hugging Face warm-up failed: {str(e)}")
+        
+        threading.Thread(target=run, name="huggingface-warm-up", daemon=True).start()
     
     def generate_audio(self, 
                       text: str, 
@@ -59,6 +233,136 @@ class HuggingFaceGenerator:
             ValueError: If there's an issue with the request or response
             RequestException: If the API request fails
         """
+        model_id, api_url, body = self._build_request(text, voice, model)
+        
+        key = cache_key(model_id, voice, text)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+        
+        # Make API request
+        logger.debug(f"Requesting speech synthesis from Hugging Face model: {model_id}")
+        # Streamed so the body can be read straight into one buffer
+        response = self.session.post(
+            api_url,
+            data=body,
+            headers={"x-use-cache": "true"},
+            stream=True,
+            timeout=30  # Speech generation can take time
+        )
+        
+        try:
+            self._check_status(response, model_id)
+            # Callers and the cache expect immutable bytes
+            audio_data = bytes(_read_body(response))
+        finally:
+            # Hand the connection back to the pool right away
+            response.close()
+        
+        return self._store_result(audio_data, key)
+    
+    async def generate_audio_async(self,
+                                   text: str,
+                                   voice: str = DEFAULT_VOICE,
+                                   model: Optional[str] = None) -> Tuple[bytes, float]:
+        """
+        Generate audio from text without blocking the event loop.
+        
+        Concurrent calls share one pooled httpx.AsyncClient. Without httpx
+        installed the blocking generate_audio runs in a worker thread instead.
+        
+        Args:
+            text: The text to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (defaults to facebook/mms-tts-eng)
+            
+        Returns:
+            Tuple[bytes, float]: Audio data as bytes and duration in seconds
+            
+        Raises:
+            ValueError: If there's an issue with the request or response
+        """
+        if httpx is None:
+            return await asyncio.to_thread(self.generate_audio, text, voice, model)
+        
+        model_id, api_url, body = self._build_request(text, voice, model)
+        
+        key = cache_key(model_id, voice, text)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+        
+        logger.debug(f"Requesting speech synthesis from Hugging Face model: {model_id}")
+        response = await self._get_async_client().post(
+            api_url,
+            content=body,
+            headers={"x-use-cache": "true"}
+        )
+        
+        return self._process_response(response, model_id, key)
+    
+    def generate_audio_stream(self,
+                              text: str,
+                              voice: str = DEFAULT_VOICE,
+                              model: Optional[str] = None,
+                              chunk_size: int = 8192) -> Iterator[bytes]:
+        """
+        Generate audio from text, yielding it as it downloads.
+        
+        The first chunk is available as soon as the API starts sending the
+        body, instead of after the whole file has arrived.
+        
+        Args:
+            text: The text to convert to speech
+            voice: The voice ID to use (default: speaker_0)
+            model: The model ID to use (defaults to facebook/mms-tts-eng)
+            chunk_size: Size of the yielded chunks in bytes
+            
+        Yields:
+            bytes: Consecutive chunks of audio data
+            
+        Raises:
+            ValueError: If there's an issue with the request or response
+            RequestException: If the API request fails
+        """
+        model_id, api_url, body = self._build_request(text, voice, model)
+        
+        key = cache_key(model_id, voice, text)
+        cached = self._cached_result(key)
+        if cached is not None:
+            yield cached[0]
+            return
+        
+        logger.debug(f"Streaming speech synthesis from Hugging Face model: {model_id}")
+        with self.session.post(
+            api_url,
+            data=body,
+            headers={"x-use-cache": "true"},
+            stream=True,
+            timeout=30
+        ) as response:
+            self._check_status(response, model_id)
+            
+            # Keep a copy for the cache while passing chunks through
+            audio_data = bytearray() if self.cache is not None else None
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if audio_data is not None:
+                    audio_data += chunk
+                yield chunk
+        
+        if audio_data is not None:
+            self.cache.put(key, bytes(audio_data))
+    
+    def _build_request(self, text: str, voice: str, model: Optional[str]) -> Tuple[str, str, bytes]:
+        """
+        Validate the input and build the Inference API request.
+        
+        Returns:
+            Tuple[str, str, bytes]: Model ID, API URL and serialized payload
+            
+        Raises:
+            ValueError: If the text is empty or no API key is configured
+        """
         if not text.strip():
             raise ValueError("Text cannot be empty")
             
@@ -71,48 +375,136 @@ class HuggingFaceGenerator:
         # Prepare API URL
         api_url = f"{self.API_URL_BASE}{model_id}"
         
-        # Prepare headers
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         # Prepare payload
+        # Ask the Inference API to serve identical prompts from its cache
         payload = {
             "inputs": text,
             "parameters": {
                 "speaker": voice
+            },
+            "options": {
+                "use_cache": True,
+                "wait_for_model": True
             }
         }
         
-        try:
-            # Make API request
-            logger.debug(f"Requesting speech synthesis from Hugging Face model: {model_id}")
-            response = requests.post(
-                api_url,
-                headers=headers,
-                json=payload,
-                timeout=30  # Speech generation can take time
-            )
-            
-            # Check response
-            response.raise_for_status()
-            
-            # Audio is returned directly as bytes
-            audio_data = response.content
-            
-            # Estimate duration (no duration info provided by API)
-            # Assuming WAV format, ~32KB per second of audio as rough estimate
-            estimated_duration = len(audio_data) / 32000
-            
-            return audio_data, estimated_duration
+        body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+        return model_id, api_url, body
+    
+    def _cached_result(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Look up previously generated audio in the local cache."""
+        if self.cache is None:
+            return None
+        
+        audio_data = self.cache.get(key)
+        if audio_data is None:
+            return None
+        
+        return audio_data, _audio_duration(audio_data)
+    
+    def _check_status(self, response, model_id: str) -> None:
+        """
+        Raise for an error response and record the model as warm otherwise.
+        
+        Raises:
+            ValueError: If the API returned an error status
+        """
+        # Only the generic branch reads the body; for 401/404 the status
+        # says everything and a streamed body is never downloaded
+        status = response.status_code
+        if status == 401:
+            raise ValueError("Hugging Face API authentication failed (401)")
+        elif status == 404:
+            raise ValueError(f"Hugging Face model not found: {model_id}")
+        elif status >= 400:
+            raise ValueError(f"Hugging Face API error {status}: {response.text[:512]}")
+        
+        # A successful generation means the model is loaded
+        _WARM_MODELS.add(model_id)
+    
+    def _process_response(self, response, model_id: str, key: Optional[str] = None) -> Tuple[bytes, float]:
+        """
+        Extract the audio from a buffered (httpx) response.
+        
+        Args:
+            response: The API response
+            model_id: The model that was requested, for error messages
+            key: Cache key to store the audio under, if caching
+        
+        Returns:
+            Tuple[bytes, float]: Audio data as bytes and duration in seconds
             
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 401:
-                raise ValueError(f"Hugging Face API authentication error: {response.text}")
-            elif response.status_code == 404:
-                raise ValueError(f"Hugging Face model not found: {model_id}")
+        Raises:
+            ValueError: If the API returned an error status
+        """
+        self._check_status(response, model_id)
+        
+        # Audio is returned directly as bytes
+        return self._store_result(response.content, key)
+    
+    def _store_result(self, audio_data: bytes, key: Optional[str]) -> Tuple[bytes, float]:
+        """Cache generated audio and pair it with its duration."""
+        if self.cache is not None and key is not None:
+            self.cache.put(key, audio_data)
+        
+        # The API provides no duration, so read it from the audio itself
+        return audio_data, _audio_duration(audio_data)
+    
+    def _get_async_client(self):
+        """
+        Return the pooled async HTTP client for the running event loop.
+        
+        A client made on an earlier loop (e.g. a previous asyncio.run) is
+        closed and replaced rather than reused.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client[0] is not loop:
+            self._close_async_client()
+        
+        if self._async_client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+                timeout=30,
+                headers=dict(self.session.headers)
+            )
+            self._async_client = (loop, client)
+        return self._async_client[1]
+    
+    def _close_async_client(self) -> None:
+        """Close the async client from synchronous code, on its own event loop."""
+        entry = self._async_client
+        self._async_client = None
+        if entry is None:
+            return
+        
+        loop, client = entry
+        if loop.is_closed():
+            # Its transports were torn down with the loop
+            return
+        try:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
             else:
-                raise ValueError(f"Hugging Face API error: {response.text}")
-        except requests.exceptions.RequestException as e:
-            raise e
\ No newline at end of file
+                loop.run_until_complete(client.aclose())
+        except RuntimeError as e:
+            # e.g. another event loop is running in this thread
+            logger.debug(f"Could not close async Hugging Face client: {str(e)}")
+    
+    def close(self) -> None:
+        """Close the async client and the HTTP session, releasing pooled connections."""
+        self._close_async_client()
+        self.session.close()
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP client and the sync session."""
+        if self._async_client is not None and self._async_client[0] is asyncio.get_running_loop():
+            client = self._async_client[1]
+            self._async_client = None
+            await client.aclose()
+        self.close()
+    
+    def __enter__(self) -> "HuggingFaceGenerator":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,90 @@
+"""
+MP3 Encoder Module
+
+This module provides the in-process MP3 encoding shared by the CLI scripts
+(run_csm, run_gtts, run_huggingface). Each script writes an MP3 next to its
+WAV for browser playback; encoding it here avoids starting ffmpeg and
+re-reading the WAV. lameenc is optional: without it submit_mp3 returns None
+and the scripts fall back to ffmpeg.
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+# In-process MP3 encoding is optional; ffmpeg is used without it
+try:
+    import lameenc
+except ImportError:
+    lameenc = None
+
+# Encodes MP3s while the calling thread writes the matching WAV
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def encode_mp3(audio, sample_rate: int) -> bytes:
+    """
+    Encode a mono audio tensor to 192 kbps MP3.
+
+    Args:
+        audio: 1-D tensor of 16-bit PCM or float samples in [-1, 1]
+        sample_rate: Sample rate of the audio in Hz
+
+    Returns:
+        bytes: MP3 file contents
+    """
+    if audio.is_floating_point():
+        audio = (audio.clamp(-1, 1) * 32767).short()
+
+    # Encoders can't be reused after flush, so build one per clip
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(192)
+    encoder.set_in_sample_rate(sample_rate)
+    encoder.set_channels(1)
+    encoder.set_quality(2)
+    pcm = audio.detach().cpu().numpy().tobytes()
+    return encoder.encode(pcm) + encoder.flush()
+
+
+def write_mp3(audio, mp3_path: str, sample_rate: int) -> None:
+    """
+    Encode a mono audio tensor and write it to mp3_path.
+
+    The file is written under a temporary name and renamed into place, so
+    a failed encode never leaves a partial MP3 at mp3_path.
+
+    Args:
+        audio: 1-D tensor of 16-bit PCM or float samples in [-1, 1]
+        mp3_path: Destination file
+        sample_rate: Sample rate of the audio in Hz
+    """
+    mp3_data = encode_mp3(audio, sample_rate)
+    temp_path = f"{mp3_path}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(mp3_data)
+        os.replace(temp_path, mp3_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def submit_mp3(audio, mp3_path: str, sample_rate: int) -> Optional[Future]:
+    """
+    Start writing the MP3 for audio on the encoder thread.
+
+    Args:
+        audio: 1-D tensor of 16-bit PCM or float samples in [-1, 1]
+        mp3_path: Destination file
+        sample_rate: Sample rate of the audio in Hz
+
+    Returns:
+        Optional[Future]: Completes when the MP3 is written, or None if
+        lameenc is not installed
+    """
+    if lameenc is None:
+        return None
+    return _executor.submit(write_mp3, audio, mp3_path, sample_rate)
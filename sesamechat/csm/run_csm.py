@@ -8,42 +8,38 @@ import os
 import sys
 import json
 import argparse
-import uuid
+import functools
+import hashlib
+import shutil
 import traceback
 import subprocess
+import tempfile
+from concurrent import futures
 from pathlib import Path
 
-# Import required packages
-try:
-    import torch
-    import torchaudio
-    import numpy as np
-    import soundfile as sf
-    from scipy import signal
-except ImportError as e:
-    print(json.dumps({
-        "success": False,
-        "error": f"Missing Python package: {str(e)}"
-    }))
-    sys.exit(1)
-
-# Import the generator from the current directory
-try:
-    from generator import Segment, load_csm_1b
-except ImportError as e:
-    print(json.dumps({
-        "success": False,
-        "error": f"Could not import generator module: {str(e)}"
-    }))
-    sys.exit(1)
-
-# Check for ffmpeg (needed for format conversion)
+# torch, torchaudio and the generator are imported by _load_backend on
+# first use: they dominate startup time and cache hits never need them
+torchaudio = None
+sf = None
+load_csm_1b = None
+
+# Model instance, loaded once per process and reused by later requests
+_model = None
+
+# The local TTS cache is optional
 try:
-    subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-    FFMPEG_AVAILABLE = True
-except (subprocess.SubprocessError, FileNotFoundError):
-    FFMPEG_AVAILABLE = False
-    print("Warning: ffmpeg not found, MP3 conversion will not be available", file=sys.stderr)
+    from tts_cache import TTSCache, cache_key
+except ImportError:
+    TTSCache = None
+
+# In-process MP3 encoding; submit_mp3 returns None without lameenc and
+# ffmpeg is used instead
+from mp3_encoder import submit_mp3
+
+@functools.cache
+def _ffmpeg_path():
+    """Locate ffmpeg (needed for format conversion) on first use"""
+    return shutil.which('ffmpeg')
 
 # Constants
 SAMPLE_RATE = 24000  # The expected sample rate for CSM
@@ -52,11 +48,52 @@ AUDIO_DIR = os.path.join(PROJECT_DIR, "public", "audio")
 INSIGHTS_DIR = os.path.join(AUDIO_DIR, "insights")
 CONVERSATIONS_DIR = os.path.join(AUDIO_DIR, "conversations")
 
+# Web root, stripped from output paths to build client-side URLs
+_PUBLIC_PREFIX = os.path.join(PROJECT_DIR, "public")
+
 # Ensure audio directories exist
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(INSIGHTS_DIR, exist_ok=True)
 os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
 
+# Directories known to exist, so repeated requests skip the mkdir
+_READY_DIRS = {AUDIO_DIR, INSIGHTS_DIR, CONVERSATIONS_DIR}
+
+@functools.cache
+def _tts_cache():
+    """Open the local TTS cache once per process"""
+    return TTSCache()
+
+def _load_backend():
+    """
+    Import the audio and model packages
+    
+    Raises:
+        ImportError: With a readable message if a package is missing
+    """
+    global torchaudio, sf, load_csm_1b
+    if load_csm_1b is not None:
+        return
+    
+    try:
+        import torchaudio
+        import soundfile as sf
+    except ImportError as e:
+        raise ImportError(f"Missing Python package: {str(e)}")
+    
+    try:
+        from generator import load_csm_1b
+    except ImportError as e:
+        raise ImportError(f"Could not import generator module: {str(e)}")
+
+def _get_model():
+    """Load the CSM model on first use and return the shared instance"""
+    global _model
+    if _model is None:
+        _load_backend()
+        _model = load_csm_1b(device="cpu")
+    return _model
+
 def generate_audio(text, speaker_id=0, output_path=None):
     """
     Generate audio from text using the CSM model
@@ -70,60 +107,119 @@ def generate_audio(text, speaker_id=0, output_path=None):
         Dictionary with success status and path or error
     """
     try:
-        # Create a model instance
-        model = load_csm_1b(device="cpu")
-        
-        # Generate the audio
-        audio = model.generate(
-            text=text,
-            speaker=speaker_id,
-            context=None,  # No context for initial generation
-            max_audio_length_ms=90_000,  # Max 90 seconds
-            temperature=0.9,
-            topk=50
-        )
-        
         # Determine the output filename
         if output_path is None:
-            filename = f"sesameai_{uuid.uuid4().hex[:8]}_{speaker_id}.wav"
+            # Name by content so identical requests map to the same file
+            digest = hashlib.blake2b(f"{speaker_id}|{text}".encode("utf-8"), digest_size=8).hexdigest()
+            filename = f"sesameai_{digest}_{speaker_id}.wav"
             output_path = os.path.join(AUDIO_DIR, filename)
+            generated_name = True
         else:
+            generated_name = False
+            
             # Make sure it's an absolute path
             if not os.path.isabs(output_path):
                 output_path = os.path.join(PROJECT_DIR, output_path)
             
             # Ensure the output directory exists
             output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
+            if output_dir not in _READY_DIRS:
+                os.makedirs(output_dir, exist_ok=True)
+                _READY_DIRS.add(output_dir)
         
-        # Save the audio
-        try:
-            # First attempt with torchaudio
-            torchaudio.save(
-                output_path,
-                audio.unsqueeze(0),  # Add channel dimension
-                SAMPLE_RATE
+        mp3_path = str(Path(output_path).with_suffix('.mp3'))
+        mp3_future = None
+        
+        # Repeated prompts are copied from the local cache instead of regenerated
+        cache = None
+        cached = None
+        if generated_name and os.path.exists(output_path):
+            # A previous run already produced this exact audio
+            cached = {"mp3Cached": os.path.exists(mp3_path)}
+        elif TTSCache is not None:
+            try:
+                cache = _tts_cache()
+                key = cache_key("csm", speaker_id, text)
+                cached = cache.fetch(key, output_path, mp3_path)
+            except OSError as e:
+                print(f"Warning: TTS cache unavailable: {str(e)}", file=sys.stderr)
+                cache = None
+        
+        if cached is None:
+            # Generate the audio
+            audio = _get_model().generate(
+                text=text,
+                speaker=speaker_id,
+                context=None,  # No context for initial generation
+                max_audio_length_ms=90_000,  # Max 90 seconds
+                temperature=0.9,
+                topk=50
             )
-        except Exception as audio_error:
-            # Fallback to soundfile if torchaudio fails
+            
+            # Quantize once to 16-bit PCM; half the bytes of float32 WAV
+            if audio.is_floating_point():
+                audio = (audio.clamp(-1, 1) * 32767).short()
+            
+            # Encode the MP3 from the same samples on a worker thread while the WAV is written
+            mp3_future = submit_mp3(audio, mp3_path, SAMPLE_RATE)
+            
+            # Save the audio under a temporary name and rename it into place,
+            # so a concurrent request for the same text never reuses a
+            # partially written file
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix=".wav")
+            os.close(fd)
             try:
-                # Convert tensor to numpy
-                audio_np = audio.detach().cpu().numpy()
-                sf.write(output_path, audio_np, SAMPLE_RATE)
-            except Exception as sf_error:
-                raise Exception(f"Failed to save audio file with both methods: {str(audio_error)} and {str(sf_error)}")
+                try:
+                    # First attempt with torchaudio
+                    torchaudio.save(
+                        temp_path,
+                        audio.unsqueeze(0),  # Add channel dimension
+                        SAMPLE_RATE,
+                        encoding="PCM_S",
+                        bits_per_sample=16
+                    )
+                except Exception as audio_error:
+                    # Fallback to soundfile if torchaudio fails
+                    try:
+                        # Convert tensor to numpy
+                        audio_np = audio.detach().cpu().numpy()
+                        sf.write(temp_path, audio_np, SAMPLE_RATE, subtype='PCM_16')
+                    except Exception as sf_error:
+                        raise Exception(f"Failed to save audio file with both methods: {str(audio_error)} and {str(sf_error)}")
+                
+                # Publish the WAV last, so once it exists the MP3 is finished too
+                if mp3_future is not None:
+                    futures.wait([mp3_future])
+                os.replace(temp_path, output_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                
+                # Don't return, or start the next batch request, while the
+                # encoder is still writing, even when the WAV could not be saved
+                if mp3_future is not None:
+                    futures.wait([mp3_future])
         
         # Verify the file was created
         if not os.path.exists(output_path):
             raise Exception(f"Audio file was not created at {output_path}")
         
         # Also create an MP3 version for better browser compatibility
-        mp3_path = output_path.replace('.wav', '.mp3')
-        if FFMPEG_AVAILABLE:
+        if cached is not None and cached.get("mp3Cached"):
+            print(f"Using cached MP3 version at {mp3_path}", file=sys.stderr)
+        elif mp3_future is not None:
+            try:
+                # Encoded from the samples in memory: no ffmpeg process and no WAV re-read
+                mp3_future.result()
+                print(f"Successfully created MP3 version at {mp3_path}", file=sys.stderr)
+            except Exception as e:
+                print(f"Warning: Failed to convert to MP3: {str(e)}", file=sys.stderr)
+                mp3_path = None
+        elif _ffmpeg_path():
             try:
                 # Use FFmpeg to convert WAV to MP3
                 subprocess.run([
-                    'ffmpeg', 
+                    _ffmpeg_path(),
                     '-y',  # Overwrite output files without asking
                     '-i', output_path,  # Input file
                     '-acodec', 'libmp3lame',  # MP3 codec
@@ -140,9 +236,12 @@ def generate_audio(text, speaker_id=0, output_path=None):
             mp3_path = None
             print("Warning: FFmpeg not available, skipping MP3 conversion", file=sys.stderr)
         
+        if cache is not None and cached is None:
+            cache.store(key, output_path, mp3_path, {"engine": "csm"})
+        
         # Return the relative path for web serving
         # Strip the 'public' directory from the path for client-side URLs
-        rel_path = output_path.replace(os.path.join(PROJECT_DIR, "public"), "")
+        rel_path = output_path[len(_PUBLIC_PREFIX):] if output_path.startswith(_PUBLIC_PREFIX) else output_path
         
         # Ensure the path starts with a slash for correct web URLs
         if not rel_path.startswith('/'):
@@ -150,7 +249,7 @@ def generate_audio(text, speaker_id=0, output_path=None):
             
         # Do the same for MP3 path if available
         if mp3_path:
-            mp3_rel_path = mp3_path.replace(os.path.join(PROJECT_DIR, "public"), "")
+            mp3_rel_path = mp3_path[len(_PUBLIC_PREFIX):] if mp3_path.startswith(_PUBLIC_PREFIX) else mp3_path
             if not mp3_rel_path.startswith('/'):
                 mp3_rel_path = '/' + mp3_rel_path
         else:
@@ -8,22 +8,35 @@ and falls back to other engines if necessary.
 
 Usage:
     python run_datacrunch.py --text "Text to convert to speech" --output /path/to/output.wav [--speaker 0] [--model model_name]
+    python run_datacrunch.py --batch [--speaker 0] [--model model_name] < requests.tsv
+
+In batch mode each stdin line is "output_path<TAB>text" and each result is
+printed as "OK<TAB>path<TAB>duration" or "ERR<TAB>path<TAB>error".
 
 Returns:
     JSON object with success status and path to generated audio file
 """
 
 import argparse
+import functools
+import io
 import json
 import logging
 import os
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 import wave
-import pydub
 from typing import Dict, Any, Optional, Tuple
 
+# Optional in-process MP3 encoding. soundfile (and pydub for the fallback)
+# are imported where they're used, so cache hits don't pay for them.
+try:
+    import lameenc
+except ImportError:
+    lameenc = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,6 +51,7 @@ sys.path.insert(0, str(parent_dir))
 
 # Import the DataCrunch generator
 from sesamechat.csm.datacrunch_generator import DataCrunchGenerator
+from sesamechat.csm.tts_cache import TTSCache, cache_key
 
 # Import fallback engines
 try:
@@ -54,34 +68,110 @@ except ImportError:
     has_huggingface = False
     logger.warning("HuggingFace generator not available for fallback")
 
+# Seconds to wait for DataCrunch before also starting Hugging Face. Off by
+# default, so Hugging Face only runs after DataCrunch fails; --hedge-ms opts in.
+HEDGE_DELAY = 0.0
+
+# Temporary outputs of engine requests still in flight, removed before exiting
+_TEMP_FILES = set()
+
+# Output directories already created by this process
+_READY_DIRS = set()
+
+
+def _ensure_dir(path: str) -> None:
+    """Create a directory once per process rather than on every request."""
+    if path not in _READY_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _READY_DIRS.add(path)
+
 
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description='Generate speech with DataCrunch TTS')
-    parser.add_argument('--text', required=True, help='Text to convert to speech')
-    parser.add_argument('--output', required=True, help='Output file path (WAV format)')
+    parser.add_argument('--text', help='Text to convert to speech')
+    parser.add_argument('--output', help='Output file path (WAV format)')
     parser.add_argument('--speaker', type=int, default=0, help='Speaker ID (0=female, 1=male)')
     parser.add_argument('--model', default=None, help='Model ID to use')
     parser.add_argument('--datacrunch-url', default=None, help='DataCrunch API URL')
     parser.add_argument('--api-key', default=None, help='DataCrunch API key')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write audio to the output file as it downloads')
+    parser.add_argument('--hedge-ms', type=int, default=int(HEDGE_DELAY * 1000),
+                        help='Milliseconds to wait for DataCrunch before also starting Hugging Face '
+                             '(default 0: Hugging Face only runs after DataCrunch fails)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Read "output_path<TAB>text" lines from stdin until EOF')
+    parser.add_argument('--audio-dir', default=None,
+                        help='Batch mode: directory for relative output paths, created once at startup')
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.batch and not (args.text and args.output):
+        parser.error('--text and --output are required unless --batch is given')
+    return args
 
 
-def convert_wav_to_mp3(wav_path: str) -> Optional[str]:
+def _encode_mp3(pcm: bytes, sample_rate: int, channels: int) -> bytes:
+    """Encode 16-bit PCM to 192 kbps MP3 with lameenc."""
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(192)
+    encoder.set_in_sample_rate(sample_rate)
+    encoder.set_channels(channels)
+    encoder.set_quality(5)
+    return encoder.encode(pcm) + encoder.flush()
+
+
+def _read_pcm(wav_path: str, wav_data: Optional[bytes]) -> Tuple[bytes, int, int]:
+    """
+    Get 16-bit PCM samples, sample rate and channel count for a WAV.
+    
+    Audio that is still in memory is parsed in place; otherwise the file
+    is decoded with soundfile.
+    """
+    if wav_data is not None:
+        try:
+            with wave.open(io.BytesIO(wav_data), 'rb') as wav_file:
+                if wav_file.getsampwidth() == 2:
+                    return (wav_file.readframes(wav_file.getnframes()),
+                            wav_file.getframerate(), wav_file.getnchannels())
+        except (wave.Error, EOFError):
+            pass
+    
+    import soundfile as sf
+    
+    data, sample_rate = sf.read(wav_path, dtype="int16")
+    return data.tobytes(), sample_rate, 1 if data.ndim == 1 else data.shape[1]
+
+
+def convert_wav_to_mp3(wav_path: str, wav_data: Optional[bytes] = None) -> Optional[str]:
     """
     Convert WAV file to MP3 for better browser compatibility.
     
     Args:
         wav_path: Path to WAV file
+        wav_data: Contents of wav_path, if still in memory, so the file
+            doesn't have to be read back
         
     Returns:
         Path to MP3 file if successful, None otherwise
     """
     try:
-        mp3_path = wav_path.replace('.wav', '.mp3')
+        mp3_path = str(Path(wav_path).with_suffix('.mp3'))
+        
+        # Encode in-process when lameenc is installed; pydub shells out to ffmpeg
+        if lameenc is not None:
+            try:
+                mp3_data = _encode_mp3(*_read_pcm(wav_path, wav_data))
+                _write_file(mp3_path, mp3_data)
+                
+                logger.info(f"Converted WAV to MP3: {mp3_path}")
+                return mp3_path
+            except Exception as e:
+                logger.warning(f"lameenc conversion failed, falling back to pydub: {str(e)}")
         
         # Convert using pydub
+        import pydub
+        
         sound = pydub.AudioSegment.from_wav(wav_path)
         sound.export(mp3_path, format="mp3", bitrate="192k")
         
@@ -143,7 +233,9 @@ def generate_speech_with_datacrunch(
     speaker_id: int = 0,
     model_id: Optional[str] = None,
     api_url: Optional[str] = None,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    stream: bool = False,
+    hedge_delay: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Generate speech using DataCrunch TTS API.
@@ -156,6 +248,10 @@ def generate_speech_with_datacrunch(
         model_id: Model ID to use
         api_url: DataCrunch API URL
         api_key: DataCrunch API key
+        stream: Write audio to output_path progressively as it downloads
+        hedge_delay: Seconds to wait for DataCrunch before also starting
+            Hugging Face, defaults to HEDGE_DELAY; 0 only falls back after
+            DataCrunch fails
         
     Returns:
         Dict with generation results
@@ -164,106 +260,360 @@ def generate_speech_with_datacrunch(
     logger.info(f"Generating speech for text: '{text[:50]}...' (length: {len(text)})")
     
     # Ensure output directory exists
-    output_dir = os.path.dirname(output_path)
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Map the speaker ID to a voice ID
-    # 0 = female, 1 = male
-    # Currently DataCrunch only has speaker_0, so we'll use it for both
-    voice_id = "speaker_0"
+    _ensure_dir(os.path.dirname(output_path))
     
-    # Try DataCrunch first
     try:
-        # Create generator with provided credentials if available
-        generator = DataCrunchGenerator(
-            api_url=api_url,
-            api_key=api_key
-        )
-        
-        # Check if DataCrunch is available
-        if generator.is_available():
-            logger.info("Using DataCrunch for speech generation")
-            
-            # Generate audio
-            audio_data, duration = generator.generate_audio(
-                text=text,
-                voice=voice_id,
-                model=model_id or "tts1"
+        cache = _tts_cache()
+    except OSError as e:
+        logger.warning(f"TTS cache unavailable: {str(e)}")
+        return _synthesize_speech(text, output_path, speaker_id, model_id, api_url, api_key, start_time,
+                                  stream, hedge_delay)
+    
+    # Identical requests produce identical audio, so serve them from the cache.
+    # The lock makes concurrent requests for the same text wait for the first
+    # one instead of all hitting the remote engines.
+    key = cache_key(text, speaker_id, model_id)
+    mp3_output_path = str(Path(output_path).with_suffix('.mp3'))
+    with cache.lock(key):
+        cached = cache.fetch(key, output_path, mp3_output_path)
+        if cached is not None:
+            web_wav_path, web_mp3_path = normalize_output_paths(
+                output_path, mp3_output_path if cached.get("mp3Cached") else None
             )
-            
-            # Save audio to file
-            with open(output_path, "wb") as f:
-                f.write(audio_data)
-                
-            logger.info(f"DataCrunch audio generated successfully! Duration: {duration:.2f} seconds")
-            
-            # Convert to MP3 for better browser compatibility
-            mp3_path = convert_wav_to_mp3(output_path)
-            
-            # Normalize paths for web access
-            web_wav_path, web_mp3_path = normalize_output_paths(output_path, mp3_path)
-            
-            # Return success
-            elapsed_time = time.time() - start_time
             return {
                 "success": True,
-                "engine": "datacrunch",
+                "engine": cached.get("engine", "cache"),
+                "cached": True,
                 "path": web_wav_path,
                 "mp3Path": web_mp3_path,
-                "duration": duration,
-                "elapsed": elapsed_time
+                "duration": cached.get("duration", 0.0),
+                "elapsed": time.time() - start_time
             }
-    except Exception as e:
-        logger.error(f"Failed to generate audio with DataCrunch: {str(e)}")
-        logger.info("Falling back to alternative engines")
-    
-    # Try Hugging Face as first fallback
-    if has_huggingface:
-        try:
-            logger.info("Falling back to Hugging Face for speech generation")
-            from sesamechat.csm.huggingface_generator import HuggingFaceGenerator
-            
-            # Create HuggingFace generator
-            hf_generator = HuggingFaceGenerator()
-            
-            # Generate audio
-            audio_data, duration = hf_generator.generate_audio(
-                text=text,
-                voice=voice_id if speaker_id == 0 else "speaker_1",
-                model=model_id
+        
+        result = _synthesize_speech(text, output_path, speaker_id, model_id, api_url, api_key, start_time,
+                                    stream, hedge_delay)
+        # Only cache the primary engines: gTTS fallback audio from an
+        # outage would otherwise be served after DataCrunch recovers
+        if result["success"] and result["engine"] in ("datacrunch", "huggingface"):
+            cache.store(
+                key,
+                output_path,
+                mp3_output_path if result.get("mp3Path") else None,
+                {"engine": result["engine"], "duration": result["duration"]}
             )
+    
+    return result
+
+
+@functools.lru_cache(maxsize=1)
+def _tts_cache() -> TTSCache:
+    """
+    Return the process-wide TTS cache.
+    
+    Built once, so batch requests skip the cache directory setup and share
+    its running size estimate. A failure raises and is retried next time.
+    """
+    return TTSCache()
+
+
+@functools.lru_cache(maxsize=4)
+def _datacrunch_generator(api_url: Optional[str], api_key: Optional[str]) -> "DataCrunchGenerator":
+    """
+    Return the DataCrunch generator for these credentials.
+    
+    Generators are shared across requests in one process, so their pooled
+    keep-alive connections and OAuth token outlive a single request. Their
+    availability result expires after DataCrunchGenerator.AVAILABILITY_TTL,
+    so a failed probe at startup is retried rather than disabling DataCrunch
+    for the rest of a batch run.
+    """
+    return DataCrunchGenerator(api_url=api_url, api_key=api_key)
+
+
+@functools.lru_cache(maxsize=1)
+def _huggingface_generator() -> "HuggingFaceGenerator":
+    """
+    Return the process-wide Hugging Face generator.
+    
+    Its own audio cache is off: generate_speech_with_datacrunch already
+    caches the finished WAV and MP3 for every engine.
+    """
+    return HuggingFaceGenerator(use_cache=False)
+
+
+def _generate_with_datacrunch(
+    text: str,
+    output_path: str,
+    voice_id: str,
+    model_id: Optional[str],
+    api_url: Optional[str],
+    api_key: Optional[str],
+    stream: bool = False
+) -> Tuple[float, Optional[bytes]]:
+    """
+    Generate speech with DataCrunch and write it to output_path.
+    
+    Returns:
+        Tuple of (duration in seconds, audio bytes). The audio is None when
+        streamed, as it was never held in memory as a whole.
+        
+    Raises:
+        RuntimeError: If DataCrunch is not available
+    """
+    # Reuse the generator for these credentials if one exists
+    generator = _datacrunch_generator(api_url, api_key)
+    
+    # Check if DataCrunch is available
+    if not generator.is_available():
+        raise RuntimeError("DataCrunch API is not available")
+    
+    logger.info("Using DataCrunch for speech generation")
+    
+    if stream:
+        _write_stream(output_path, generator.generate_audio_stream(
+            text=text,
+            voice=voice_id,
+            model=model_id or "tts1"
+        ))
+        return get_wav_duration(output_path), None
+    
+    # Generate audio
+    audio_data, duration = generator.generate_audio(
+        text=text,
+        voice=voice_id,
+        model=model_id or "tts1"
+    )
+    
+    # Save audio to file
+    _write_file(output_path, audio_data)
+    
+    return duration, audio_data
+
+
+def _generate_with_huggingface(
+    text: str,
+    output_path: str,
+    voice_id: str,
+    model_id: Optional[str],
+    stream: bool = False
+) -> Tuple[float, Optional[bytes]]:
+    """
+    Generate speech with Hugging Face and write it to output_path.
+    
+    Returns:
+        Tuple of (duration in seconds, audio bytes). The audio is None when
+        streamed, as it was never held in memory as a whole.
+    """
+    logger.info("Using Hugging Face for speech generation")
+    
+    # Reuse the shared HuggingFace generator
+    hf_generator = _huggingface_generator()
+    
+    if stream:
+        _write_stream(output_path, hf_generator.generate_audio_stream(
+            text=text,
+            voice=voice_id,
+            model=model_id
+        ))
+        return get_wav_duration(output_path), None
+    
+    # Generate audio
+    audio_data, duration = hf_generator.generate_audio(
+        text=text,
+        voice=voice_id,
+        model=model_id
+    )
+    
+    # Save audio to file
+    _write_file(output_path, audio_data)
+    
+    return duration, audio_data
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """
+    Write data to path with unbuffered os.write calls.
+    
+    Large audio payloads are handed to the kernel directly rather than
+    being copied through a buffered file object.
+    """
+    view = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _write_stream(path: str, chunks) -> None:
+    """Write audio chunks to path as they arrive, unbuffered."""
+    with open(path, "wb", buffering=0) as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _remove_file(path: str) -> None:
+    """Remove a file if it exists."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _remove_temp_file(path: str) -> None:
+    """Remove an engine's temporary output and stop tracking it."""
+    _remove_file(path)
+    _TEMP_FILES.discard(path)
+
+
+def _remove_temp_files() -> None:
+    """
+    Remove temporary outputs of requests that are still running.
+    
+    Called before os._exit, which skips the done-callbacks that would
+    otherwise clean up after a losing hedged request.
+    """
+    for path in list(_TEMP_FILES):
+        _remove_temp_file(path)
+
+
+def _generate_hedged(
+    text: str,
+    output_path: str,
+    speaker_id: int,
+    model_id: Optional[str],
+    api_url: Optional[str],
+    api_key: Optional[str],
+    stream: bool = False,
+    hedge_delay: Optional[float] = None
+) -> Optional[Tuple[str, float, Optional[bytes]]]:
+    """
+    Race DataCrunch against Hugging Face.
+    
+    DataCrunch starts immediately; Hugging Face is only started if DataCrunch
+    has not finished within hedge_delay seconds (or fails sooner). The first
+    engine to succeed wins, so a slow or hanging DataCrunch request no longer
+    has to time out before the fallback is tried. With a hedge_delay of 0,
+    the default, Hugging Face only runs after DataCrunch fails. Each engine
+    writes to its own temporary file and the winner's file is moved onto
+    output_path.
+    
+    Returns:
+        Tuple of (engine name, duration, audio bytes or None) from the
+        winning engine, or None if both engines failed
+    """
+    if hedge_delay is None:
+        hedge_delay = HEDGE_DELAY
+    
+    # Map the speaker ID to a voice ID
+    # 0 = female, 1 = male
+    # Currently DataCrunch only has speaker_0, so we'll use it for both
+    voice_id = "speaker_0"
+    
+    executor = ThreadPoolExecutor(max_workers=2)
+    futures = {}
+    
+    def submit(engine, func, *args):
+        temp_path = f"{output_path}.{engine}.tmp"
+        _TEMP_FILES.add(temp_path)
+        future = executor.submit(func, text, temp_path, *args)
+        futures[future] = (engine, temp_path)
+    
+    submit("datacrunch", _generate_with_datacrunch, voice_id, model_id, api_url, api_key, stream)
+    hedged = False
+    winner = None
+    
+    try:
+        pending = set(futures)
+        while pending and winner is None:
+            # Hugging Face is started once the hedge delay has passed or
+            # DataCrunch failed, whichever comes first. Without a delay it
+            # only runs as a fallback after DataCrunch fails.
+            timeout = None if hedged or not has_huggingface or hedge_delay <= 0 else hedge_delay
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
             
-            # Save audio to file
-            with open(output_path, "wb") as f:
-                f.write(audio_data)
-                
-            logger.info(f"Hugging Face audio generated successfully! Duration: {duration:.2f} seconds")
-            
-            # Convert to MP3 for better browser compatibility
-            mp3_path = convert_wav_to_mp3(output_path)
-            
-            # Normalize paths for web access
-            web_wav_path, web_mp3_path = normalize_output_paths(output_path, mp3_path)
+            for future in done:
+                engine, temp_path = futures[future]
+                try:
+                    duration, audio_data = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to generate audio with {engine}: {str(e)}")
+                    _remove_temp_file(temp_path)
+                    continue
+                winner = (engine, duration, audio_data)
+                os.replace(temp_path, output_path)
+                _TEMP_FILES.discard(temp_path)
+                break
             
-            # Return success
-            elapsed_time = time.time() - start_time
-            return {
-                "success": True,
-                "engine": "huggingface",
-                "path": web_wav_path,
-                "mp3Path": web_mp3_path,
-                "duration": duration,
-                "elapsed": elapsed_time
-            }
-        except Exception as e:
-            logger.error(f"Failed to generate audio with Hugging Face: {str(e)}")
-            logger.info("Falling back to Google TTS")
+            if winner is None and not hedged and has_huggingface:
+                hedged = True
+                logger.info("Starting Hugging Face alongside DataCrunch")
+                submit("huggingface", _generate_with_huggingface,
+                       voice_id if speaker_id == 0 else "speaker_1", model_id, stream)
+                pending = {f for f in futures if not f.done()}
+        
+        # A losing request can't be interrupted; discard its output once it
+        # finishes
+        for future, (engine, temp_path) in futures.items():
+            if winner is None or engine != winner[0]:
+                future.cancel()
+                future.add_done_callback(lambda _, path=temp_path: _remove_temp_file(path))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return winner
+
+
+def _synthesize_speech(
+    text: str,
+    output_path: str,
+    speaker_id: int,
+    model_id: Optional[str],
+    api_url: Optional[str],
+    api_key: Optional[str],
+    start_time: float,
+    stream: bool = False,
+    hedge_delay: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Generate speech with the engine chain, bypassing the cache.
+    
+    Races DataCrunch against Hugging Face, then falls back to Google TTS.
+    
+    Returns:
+        Dict with generation results
+    """
+    winner = _generate_hedged(text, output_path, speaker_id, model_id, api_url, api_key, stream, hedge_delay)
+    if winner is not None:
+        engine, duration, audio_data = winner
+        logger.info(f"{engine} audio generated successfully! Duration: {duration:.2f} seconds")
+        
+        # Convert to MP3 for better browser compatibility, from the audio
+        # still in memory rather than reading the WAV back
+        mp3_path = convert_wav_to_mp3(output_path, audio_data)
+        
+        # Normalize paths for web access
+        web_wav_path, web_mp3_path = normalize_output_paths(output_path, mp3_path)
+        
+        # Return success
+        elapsed_time = time.time() - start_time
+        return {
+            "success": True,
+            "engine": engine,
+            "path": web_wav_path,
+            "mp3Path": web_mp3_path,
+            "duration": duration,
+            "elapsed": elapsed_time
+        }
+    
+    logger.info("Falling back to Google TTS")
     
     # Try Google TTS as final fallback
     if has_gtts:
         try:
             logger.info("Falling back to Google TTS for speech generation")
-            from sesamechat.csm.gtts_generator import GttsGenerator
             
             # Create Google TTS generator
             gtts_generator = GttsGenerator()
@@ -305,10 +655,70 @@ def generate_speech_with_datacrunch(
     }
 
 
+def _hedge_delay(args) -> float:
+    """Convert --hedge-ms to seconds."""
+    return args.hedge_ms / 1000
+
+
+def run_batch(args) -> None:
+    """
+    Serve "output_path<TAB>text" requests from stdin until EOF.
+    
+    Clients, connection pools and tokens are set up by the first request
+    and reused by the rest, instead of once per process as in one-shot mode.
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    audio_dir = None
+    if args.audio_dir:
+        audio_dir = os.path.abspath(args.audio_dir)
+        _ensure_dir(audio_dir)
+    
+    for line in sys.stdin:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        
+        path, _, text = line.partition('\t')
+        if audio_dir and not os.path.isabs(path):
+            path = os.path.join(audio_dir, path)
+        try:
+            if not text:
+                raise ValueError('expected "output_path<TAB>text"')
+            result = generate_speech_with_datacrunch(
+                text=text,
+                output_path=path,
+                speaker_id=args.speaker,
+                model_id=args.model,
+                api_url=args.datacrunch_url,
+                api_key=args.api_key,
+                stream=args.stream,
+                hedge_delay=_hedge_delay(args)
+            )
+        except Exception as e:
+            logger.error(f"Error: {str(e)}")
+            result = {"success": False, "error": str(e)}
+        
+        if result["success"]:
+            print(f"OK\t{path}\t{result.get('duration', 0.0)}", flush=True)
+        else:
+            # Keep the error on one line so the protocol stays line-based
+            error = " ".join(str(result.get("error", "")).split())
+            print(f"ERR\t{path}\t{error}", flush=True)
+
+
 def main():
     """Main function."""
     args = parse_args()
     
+    if args.batch:
+        run_batch(args)
+        _remove_temp_files()
+        sys.stdout.flush()
+        logging.shutdown()
+        os._exit(0)
+    
     try:
         # Generate speech with DataCrunch (with fallbacks)
         result = generate_speech_with_datacrunch(
@@ -317,14 +727,20 @@ def main():
             speaker_id=args.speaker,
             model_id=args.model,
             api_url=args.datacrunch_url,
-            api_key=args.api_key
+            api_key=args.api_key,
+            stream=args.stream,
+            hedge_delay=_hedge_delay(args)
         )
         
         # Print result as JSON for the TypeScript service to parse
         print(json.dumps(result))
+        _remove_temp_files()
+        sys.stdout.flush()
+        logging.shutdown()
         
-        # Exit with appropriate code
-        sys.exit(0 if result["success"] else 1)
+        # Exit with appropriate code. os._exit doesn't wait for a losing
+        # hedged request that is still running in a worker thread.
+        os._exit(0 if result["success"] else 1)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         error_result = {
@@ -8,18 +8,18 @@ import os
 import sys
 import json
 import argparse
-import uuid
+import itertools
+import functools
+import shutil
 import traceback
 import subprocess
+from concurrent import futures
 from pathlib import Path
 
-# Import required packages
+# Import required packages; soundfile is only needed by the fallback writer
 try:
     import torch
     import torchaudio
-    import numpy as np
-    import soundfile as sf
-    from scipy import signal
 except ImportError as e:
     print(json.dumps({
         "success": False,
@@ -37,13 +37,14 @@ except ImportError as e:
     }))
     sys.exit(1)
 
-# Check for ffmpeg (needed for format conversion)
-try:
-    subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-    FFMPEG_AVAILABLE = True
-except (subprocess.SubprocessError, FileNotFoundError):
-    FFMPEG_AVAILABLE = False
-    print("Warning: ffmpeg not found, MP3 conversion will not be available", file=sys.stderr)
+# In-process MP3 encoding; submit_mp3 returns None without lameenc and
+# ffmpeg is used instead
+from mp3_encoder import submit_mp3
+
+@functools.cache
+def _ffmpeg_path():
+    """Locate ffmpeg (needed for format conversion) on first use"""
+    return shutil.which('ffmpeg')
 
 # Constants
 SAMPLE_RATE = 24000  # The expected sample rate for audio output
@@ -52,11 +53,22 @@ AUDIO_DIR = os.path.join(PROJECT_DIR, "public", "audio")
 INSIGHTS_DIR = os.path.join(AUDIO_DIR, "insights")
 CONVERSATIONS_DIR = os.path.join(AUDIO_DIR, "conversations")
 
+# Web root, stripped from output paths to build client-side URLs
+_PUBLIC_PREFIX = os.path.join(PROJECT_DIR, "public")
+
+# Generated filenames: a random tag drawn once per process plus a counter,
+# so names never collide within a run or with files left by earlier runs
+_RUN_ID = os.urandom(4).hex()
+_FILE_COUNTER = itertools.count()
+
 # Ensure audio directories exist
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(INSIGHTS_DIR, exist_ok=True)
 os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
 
+# Directories known to exist, so repeated requests skip the mkdir
+_READY_DIRS = {AUDIO_DIR, INSIGHTS_DIR, CONVERSATIONS_DIR}
+
 def generate_audio(text, speaker_id=0, output_path=None):
     """
     Generate audio from text using the gTTS model
@@ -85,7 +97,7 @@ def generate_audio(text, speaker_id=0, output_path=None):
         
         # Determine the output filename
         if output_path is None:
-            filename = f"gtts_{uuid.uuid4().hex[:8]}_{speaker_id}.wav"
+            filename = f"gtts_{_RUN_ID}_{next(_FILE_COUNTER):x}_{speaker_id}.wav"
             output_path = os.path.join(AUDIO_DIR, filename)
         else:
             # Make sure it's an absolute path
@@ -94,36 +106,63 @@ def generate_audio(text, speaker_id=0, output_path=None):
             
             # Ensure the output directory exists
             output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
+            if output_dir not in _READY_DIRS:
+                os.makedirs(output_dir, exist_ok=True)
+                _READY_DIRS.add(output_dir)
+        
+        # Quantize once to 16-bit PCM; half the bytes of float32 WAV
+        if audio.is_floating_point():
+            audio = (audio.clamp(-1, 1) * 32767).to(torch.int16)
+        
+        mp3_path = str(Path(output_path).with_suffix('.mp3'))
+        
+        # Encode the MP3 from the same samples on a worker thread while the WAV is written
+        mp3_future = submit_mp3(audio, mp3_path, SAMPLE_RATE)
         
         # Save the audio
         try:
             # First attempt with torchaudio
             torchaudio.save(
                 output_path,
-                audio.unsqueeze(0),  # Add channel dimension
-                SAMPLE_RATE
+                audio.unsqueeze(0).cpu(),  # Add channel dimension
+                SAMPLE_RATE,
+                encoding="PCM_S",
+                bits_per_sample=16
             )
         except Exception as audio_error:
             # Fallback to soundfile if torchaudio fails
             try:
+                import soundfile as sf
+                
                 # Convert tensor to numpy
                 audio_np = audio.detach().cpu().numpy()
-                sf.write(output_path, audio_np, SAMPLE_RATE)
+                sf.write(output_path, audio_np, SAMPLE_RATE, subtype='PCM_16')
             except Exception as sf_error:
                 raise Exception(f"Failed to save audio file with both methods: {str(audio_error)} and {str(sf_error)}")
+        finally:
+            # Don't return, or start the next batch request, while the
+            # encoder is still writing, even when the WAV could not be saved
+            if mp3_future is not None:
+                futures.wait([mp3_future])
         
         # Verify the file was created
         if not os.path.exists(output_path):
             raise Exception(f"Audio file was not created at {output_path}")
         
         # Also create an MP3 version for better browser compatibility
-        mp3_path = output_path.replace('.wav', '.mp3')
-        if FFMPEG_AVAILABLE:
+        if mp3_future is not None:
+            try:
+                # Encoded from the samples in memory: no ffmpeg process and no WAV re-read
+                mp3_future.result()
+                print(f"Successfully created MP3 version at {mp3_path}", file=sys.stderr)
+            except Exception as e:
+                print(f"Warning: Failed to convert to MP3: {str(e)}", file=sys.stderr)
+                mp3_path = None
+        elif _ffmpeg_path():
             try:
                 # Use FFmpeg to convert WAV to MP3
                 subprocess.run([
-                    'ffmpeg', 
+                    _ffmpeg_path(),
                     '-y',  # Overwrite output files without asking
                     '-i', output_path,  # Input file
                     '-acodec', 'libmp3lame',  # MP3 codec
@@ -142,7 +181,7 @@ def generate_audio(text, speaker_id=0, output_path=None):
         
         # Return the relative path for web serving
         # Strip the 'public' directory from the path for client-side URLs
-        rel_path = output_path.replace(os.path.join(PROJECT_DIR, "public"), "")
+        rel_path = output_path[len(_PUBLIC_PREFIX):] if output_path.startswith(_PUBLIC_PREFIX) else output_path
         
         # Ensure the path starts with a slash for correct web URLs
         if not rel_path.startswith('/'):
@@ -150,7 +189,7 @@ def generate_audio(text, speaker_id=0, output_path=None):
             
         # Do the same for MP3 path if available
         if mp3_path:
-            mp3_rel_path = mp3_path.replace(os.path.join(PROJECT_DIR, "public"), "")
+            mp3_rel_path = mp3_path[len(_PUBLIC_PREFIX):] if mp3_path.startswith(_PUBLIC_PREFIX) else mp3_path
             if not mp3_rel_path.startswith('/'):
                 mp3_rel_path = '/' + mp3_rel_path
         else:
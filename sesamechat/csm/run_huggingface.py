@@ -8,18 +8,22 @@ import os
 import sys
 import json
 import argparse
-import uuid
+import itertools
+import functools
+import shutil
 import traceback
 import subprocess
+import threading
+from concurrent import futures
 from pathlib import Path
 
-# Import required packages
+# Skip Hugging Face Hub telemetry requests while loading models
+os.environ.setdefault("HF_HUB_DISABLE_TELEMETRY", "1")
+
+# Import required packages; soundfile is only needed by the fallback writer
 try:
     import torch
     import torchaudio
-    import numpy as np
-    import soundfile as sf
-    from scipy import signal
 except ImportError as e:
     print(json.dumps({
         "success": False,
@@ -44,27 +48,101 @@ if CUDA_AVAILABLE:
 else:
     print("CUDA is not available, using CPU mode", file=sys.stderr)
 
-# Check for ffmpeg (needed for format conversion)
-try:
-    subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-    FFMPEG_AVAILABLE = True
-except (subprocess.SubprocessError, FileNotFoundError):
-    FFMPEG_AVAILABLE = False
-    print("Warning: ffmpeg not found, MP3 conversion will not be available", file=sys.stderr)
+# Let cuDNN pick the fastest kernels and run generation in reduced precision:
+# BF16 on Ampere and newer, FP16 on older tensor-core GPUs
+AUTOCAST_DTYPE = None
+if CUDA_AVAILABLE:
+    torch.backends.cudnn.benchmark = True
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.set_float32_matmul_precision('high')
+    AUTOCAST_DTYPE = torch.bfloat16 if torch.cuda.get_device_capability()[0] >= 8 else torch.float16
+
+# In-process MP3 encoding; submit_mp3 returns None without lameenc and
+# ffmpeg is used instead
+from mp3_encoder import submit_mp3
+
+@functools.cache
+def _ffmpeg_path():
+    """Locate ffmpeg (needed for format conversion) on first use"""
+    return shutil.which('ffmpeg')
 
 # Constants
 SAMPLE_RATE = 24000  # The expected sample rate for CSM
+DEFAULT_MODEL_ID = "sesame/csm-1b"
 PROJECT_DIR = os.getcwd()
 AUDIO_DIR = os.path.join(PROJECT_DIR, "public", "audio")
 INSIGHTS_DIR = os.path.join(AUDIO_DIR, "insights")
 CONVERSATIONS_DIR = os.path.join(AUDIO_DIR, "conversations")
 
+# Web root, stripped from output paths to build client-side URLs
+_PUBLIC_PREFIX = os.path.join(PROJECT_DIR, "public")
+
+# Generated filenames: a random tag drawn once per process plus a counter,
+# so names never collide within a run or with files left by earlier runs
+_RUN_ID = os.urandom(4).hex()
+_FILE_COUNTER = itertools.count()
+
 # Ensure audio directories exist
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(INSIGHTS_DIR, exist_ok=True)
 os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
 
-def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b"):
+# Directories known to exist, so repeated requests skip the mkdir
+_READY_DIRS = {AUDIO_DIR, INSIGHTS_DIR, CONVERSATIONS_DIR}
+
+# Loaded models by model ID, reused by later requests in batch mode
+_models = {}
+# Held while a model loads, so a request waits for a preload in progress
+_models_lock = threading.Lock()
+
+def _get_model(model_id):
+    """Load a model on first use and return the shared instance"""
+    with _models_lock:
+        if model_id not in _models:
+            device = "cuda" if CUDA_AVAILABLE else "cpu"
+            _models[model_id] = load_huggingface_model(model_id=model_id, device=device)
+        return _models[model_id]
+
+def _preload(model_id):
+    """Load a model in the background; errors resurface when it's used"""
+    try:
+        if CUDA_AVAILABLE:
+            torch.cuda.set_device(0)
+        _get_model(model_id)
+    except Exception as e:
+        print(f"Warning: Failed to preload {model_id}: {str(e)}", file=sys.stderr)
+
+# Reusable page-locked host buffer for copying generated audio off the GPU
+_pinned = None
+
+def _to_host(audio):
+    """
+    Copy generated audio to host memory once
+    
+    On CUDA the copy goes through a pinned buffer, which the GPU can DMA
+    into directly instead of staging through pageable memory.
+    
+    Args:
+        audio: Audio tensor on any device
+    
+    Returns:
+        CPU tensor with the same samples. On CUDA it is a view of the
+        shared buffer, valid until the next call.
+    """
+    global _pinned
+    audio = audio.detach()
+    if not audio.is_cuda:
+        return audio
+    
+    n = audio.numel()
+    if _pinned is None or _pinned.dtype != audio.dtype or _pinned.numel() < n:
+        _pinned = torch.empty(max(n, 90 * SAMPLE_RATE), dtype=audio.dtype, pin_memory=True)
+    host = _pinned[:n]
+    host.copy_(audio.reshape(-1), non_blocking=True)
+    torch.cuda.current_stream().synchronize()
+    return host.view(audio.shape)
+
+def generate_audio(text, speaker_id=0, output_path=None, model_id=DEFAULT_MODEL_ID):
     """
     Generate audio from text using the Hugging Face CSM model
     
@@ -78,23 +156,26 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
         Dictionary with success status and path or error
     """
     try:
-        # Create a model instance
-        device = "cuda" if CUDA_AVAILABLE else "cpu"
-        model = load_huggingface_model(model_id=model_id, device=device)
-        
         # Generate the audio
-        audio = model.generate(
-            text=text,
-            speaker=speaker_id,
-            context=None,  # No context for initial generation
-            max_audio_length_ms=90_000,  # Max 90 seconds
-            temperature=0.9,
-            topk=50
-        )
+        model = _get_model(model_id)
+        # Autocast keeps precision-sensitive ops such as norms in FP32
+        with torch.autocast('cuda', dtype=AUTOCAST_DTYPE, enabled=AUTOCAST_DTYPE is not None):
+            audio = model.generate(
+                text=text,
+                speaker=speaker_id,
+                context=None,  # No context for initial generation
+                max_audio_length_ms=90_000,  # Max 90 seconds
+                temperature=0.9,
+                topk=50
+            )
+        
+        # Drop per-utterance decoder state so it doesn't grow across a batch
+        if hasattr(model, "reset_caches"):
+            model.reset_caches()
         
         # Determine the output filename
         if output_path is None:
-            filename = f"hf_{uuid.uuid4().hex[:8]}_{speaker_id}.wav"
+            filename = f"hf_{_RUN_ID}_{next(_FILE_COUNTER):x}_{speaker_id}.wav"
             output_path = os.path.join(AUDIO_DIR, filename)
         else:
             # Make sure it's an absolute path
@@ -103,7 +184,21 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
             
             # Ensure the output directory exists
             output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
+            if output_dir not in _READY_DIRS:
+                os.makedirs(output_dir, exist_ok=True)
+                _READY_DIRS.add(output_dir)
+        
+        # Quantize once to 16-bit PCM; half the bytes of float32 WAV
+        if audio.is_floating_point():
+            audio = (audio.clamp(-1, 1) * 32767).to(torch.int16)
+        
+        # A single device-to-host copy, shared by the WAV and MP3 writers
+        audio = _to_host(audio)
+        
+        mp3_path = str(Path(output_path).with_suffix('.mp3'))
+        
+        # Encode the MP3 from the same samples on a worker thread while the WAV is written
+        mp3_future = submit_mp3(audio, mp3_path, SAMPLE_RATE)
         
         # Save the audio
         try:
@@ -111,28 +206,44 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
             torchaudio.save(
                 output_path,
                 audio.unsqueeze(0),  # Add channel dimension
-                SAMPLE_RATE
+                SAMPLE_RATE,
+                encoding="PCM_S",
+                bits_per_sample=16
             )
         except Exception as audio_error:
             # Fallback to soundfile if torchaudio fails
             try:
+                import soundfile as sf
+                
                 # Convert tensor to numpy
-                audio_np = audio.detach().cpu().numpy()
-                sf.write(output_path, audio_np, SAMPLE_RATE)
+                audio_np = audio.numpy()
+                sf.write(output_path, audio_np, SAMPLE_RATE, subtype='PCM_16')
             except Exception as sf_error:
                 raise Exception(f"Failed to save audio file with both methods: {str(audio_error)} and {str(sf_error)}")
+        finally:
+            # The encoder reads the same host buffer the next request reuses,
+            # so wait for it even when the WAV could not be saved
+            if mp3_future is not None:
+                futures.wait([mp3_future])
         
         # Verify the file was created
         if not os.path.exists(output_path):
             raise Exception(f"Audio file was not created at {output_path}")
         
         # Also create an MP3 version for better browser compatibility
-        mp3_path = output_path.replace('.wav', '.mp3')
-        if FFMPEG_AVAILABLE:
+        if mp3_future is not None:
+            try:
+                # Encoded from the samples in memory: no ffmpeg process and no WAV re-read
+                mp3_future.result()
+                print(f"Successfully created MP3 version at {mp3_path}", file=sys.stderr)
+            except Exception as e:
+                print(f"Warning: Failed to convert to MP3: {str(e)}", file=sys.stderr)
+                mp3_path = None
+        elif _ffmpeg_path():
             try:
                 # Use FFmpeg to convert WAV to MP3
                 subprocess.run([
-                    'ffmpeg', 
+                    _ffmpeg_path(),
                     '-y',  # Overwrite output files without asking
                     '-i', output_path,  # Input file
                     '-acodec', 'libmp3lame',  # MP3 codec
@@ -151,7 +262,7 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
         
         # Return the relative path for web serving
         # Strip the 'public' directory from the path for client-side URLs
-        rel_path = output_path.replace(os.path.join(PROJECT_DIR, "public"), "")
+        rel_path = output_path[len(_PUBLIC_PREFIX):] if output_path.startswith(_PUBLIC_PREFIX) else output_path
         
         # Ensure the path starts with a slash for correct web URLs
         if not rel_path.startswith('/'):
@@ -159,7 +270,7 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
             
         # Do the same for MP3 path if available
         if mp3_path:
-            mp3_rel_path = mp3_path.replace(os.path.join(PROJECT_DIR, "public"), "")
+            mp3_rel_path = mp3_path[len(_PUBLIC_PREFIX):] if mp3_path.startswith(_PUBLIC_PREFIX) else mp3_path
             if not mp3_rel_path.startswith('/'):
                 mp3_rel_path = '/' + mp3_rel_path
         else:
@@ -169,7 +280,8 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
             "success": True,
             "path": rel_path,
             "mp3Path": mp3_rel_path,
-            "fullPath": output_path
+            "fullPath": output_path,
+            "duration": audio.shape[-1] / SAMPLE_RATE
         }
     except Exception as e:
         # Print the error and traceback to stderr for debugging
@@ -184,19 +296,76 @@ def generate_audio(text, speaker_id=0, output_path=None, model_id="sesame/csm-1b
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Convert text to speech using Hugging Face CSM-1B model')
-    parser.add_argument('--text', required=True, help='Text to convert to speech')
+    parser.add_argument('--text', help='Text to convert to speech')
     parser.add_argument('--speaker', type=int, default=0, help='Speaker ID (0=female, 1=male)')
     parser.add_argument('--output', help='Path to save the output audio file')
-    parser.add_argument('--model', default='sesame/csm-1b', help='Hugging Face model ID to use')
-    return parser.parse_args()
+    parser.add_argument('--model', default=DEFAULT_MODEL_ID, help='Hugging Face model ID to use')
+    parser.add_argument('--batch', action='store_true',
+                        help='Read "output_path<TAB>text" lines from stdin until EOF')
+    parser.add_argument('--audio-dir', default=None,
+                        help='Batch mode: directory for relative output paths, created once at startup')
+    args = parser.parse_args()
+    if not args.batch and not args.text:
+        parser.error('--text is required unless --batch is given')
+    return args
+
+def run_batch(args):
+    """
+    Serve requests from stdin with one loaded model
+    
+    Each line is "output_path<TAB>text"; an empty output_path picks a
+    generated name. Each result is printed as "OK<TAB>path<TAB>duration"
+    or "ERR<TAB>path<TAB>error". With --audio-dir, relative paths are
+    resolved against that directory instead of the working directory.
+    """
+    audio_dir = None
+    if args.audio_dir:
+        audio_dir = os.path.abspath(args.audio_dir)
+        os.makedirs(audio_dir, exist_ok=True)
+        _READY_DIRS.add(audio_dir)
+    
+    for line in sys.stdin:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        
+        path, _, text = line.partition('\t')
+        if not text:
+            print(f"ERR\t{path}\texpected \"output_path<TAB>text\"", flush=True)
+            continue
+        
+        if audio_dir and path and not os.path.isabs(path):
+            path = os.path.join(audio_dir, path)
+        
+        result = generate_audio(
+            text=text,
+            speaker_id=args.speaker,
+            output_path=path or None,
+            model_id=args.model
+        )
+        
+        if result["success"]:
+            print(f"OK\t{result['fullPath']}\t{result['duration']}", flush=True)
+        else:
+            # Keep the error on one line so the protocol stays line-based
+            error = " ".join(result["error"].split())
+            print(f"ERR\t{path}\t{error}", flush=True)
 
 def main():
     """
     Main function to handle CLI invocation
     """
+    # Start loading the default model while arguments and input are read
+    if not any(arg.startswith('--model') for arg in sys.argv[1:]):
+        threading.Thread(target=_preload, args=(DEFAULT_MODEL_ID,), daemon=True).start()
+    
     try:
         args = parse_args()
         
+        if args.batch:
+            run_batch(args)
+            return
+        
         # Generate the audio
         result = generate_audio(
             text=args.text,
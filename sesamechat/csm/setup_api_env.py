@@ -8,6 +8,9 @@ import sys
 import argparse
 import json
 
+# API settings from the process environment, read once at import
+_ENV = {key: os.environ.get(key) for key in ('DATACRUNCH_URL', 'DATACRUNCH_API_KEY', 'HUGGINGFACE_API_KEY')}
+
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Setup API environment variables for DataCrunch and HuggingFace')
@@ -17,6 +20,8 @@ def parse_args():
     parser.add_argument('--huggingface-api-key', type=str, help='API key for Hugging Face')
     parser.add_argument('--env-file', type=str, default='.env', help='Path to .env file to update')
     parser.add_argument('--check-only', action='store_true', help='Only check the environment variables, do not update')
+    parser.add_argument('--serve', action='store_true',
+                        help='Handle JSON requests from stdin, one per line, until EOF')
     
     return parser.parse_args()
 
@@ -24,16 +29,17 @@ def update_env_file(env_file, datacrunch_url=None, datacrunch_api_key=None, hugg
     """Update .env file with API keys"""
     env_vars = {}
     
-    # Read existing .env file if it exists
+    # Read existing .env file if it exists, in one read
     if os.path.exists(env_file):
         with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip()
+            data = f.read()
+        for line in data.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            key, sep, value = line.partition('=')
+            if sep:
+                env_vars[key.strip()] = value.strip()
     
     # Update environment variables
     if datacrunch_url:
@@ -43,53 +49,43 @@ def update_env_file(env_file, datacrunch_url=None, datacrunch_api_key=None, hugg
     if huggingface_api_key:
         env_vars['HUGGINGFACE_API_KEY'] = huggingface_api_key
     
-    # Write back to .env file
+    # Write back to .env file with a single write
+    output = "".join(f"{key}={value}\n" for key, value in sorted(env_vars.items()))
     with open(env_file, 'w') as f:
-        for key, value in sorted(env_vars.items()):
-            f.write(f"{key}={value}\n")
+        f.write(output)
     
     return env_vars
 
 def check_env_vars():
     """Check if environment variables are set"""
-    datacrunch_url = os.environ.get('DATACRUNCH_URL')
-    datacrunch_api_key = os.environ.get('DATACRUNCH_API_KEY')
-    huggingface_api_key = os.environ.get('HUGGINGFACE_API_KEY')
-    
+    # The URL is reported as-is; keys only as whether they are set
     return {
-        'DATACRUNCH_URL': datacrunch_url,
-        'DATACRUNCH_API_KEY': datacrunch_api_key != None,
-        'HUGGINGFACE_API_KEY': huggingface_api_key != None
+        key: value if key.endswith('URL') else value is not None
+        for key, value in _ENV.items()
     }
 
-def main():
-    """Main function"""
-    args = parse_args()
-    
-    if args.check_only:
-        # Check and report current environment variables
-        env_vars = check_env_vars()
-        result = {
-            'status': 'ok',
-            'message': 'Current environment variable status',
-            'datacrunch_url': env_vars['DATACRUNCH_URL'],
-            'datacrunch_api_key_set': env_vars['DATACRUNCH_API_KEY'],
-            'huggingface_api_key_set': env_vars['HUGGINGFACE_API_KEY']
-        }
-        print(json.dumps(result))
-        return 0
-    
+def check_result():
+    """Build the report for a check request"""
+    env_vars = check_env_vars()
+    return {
+        'status': 'ok',
+        'message': 'Current environment variable status',
+        'datacrunch_url': env_vars['DATACRUNCH_URL'],
+        'datacrunch_api_key_set': env_vars['DATACRUNCH_API_KEY'],
+        'huggingface_api_key_set': env_vars['HUGGINGFACE_API_KEY']
+    }
+
+def update_result(env_file, datacrunch_url=None, datacrunch_api_key=None, huggingface_api_key=None):
+    """Update the .env file and build the report for an update request"""
     try:
-        # Update .env file
         updated_vars = update_env_file(
-            args.env_file,
-            datacrunch_url=args.datacrunch_url,
-            datacrunch_api_key=args.datacrunch_api_key,
-            huggingface_api_key=args.huggingface_api_key
+            env_file,
+            datacrunch_url=datacrunch_url,
+            datacrunch_api_key=datacrunch_api_key,
+            huggingface_api_key=huggingface_api_key
         )
         
-        # Report result
-        result = {
+        return {
             'status': 'ok',
             'message': 'Environment variables updated successfully',
             'updated': {
@@ -97,18 +93,69 @@ def main():
                 'DATACRUNCH_API_KEY': 'DATACRUNCH_API_KEY' in updated_vars,
                 'HUGGINGFACE_API_KEY': 'HUGGINGFACE_API_KEY' in updated_vars
             },
-            'env_file': args.env_file
+            'env_file': env_file
         }
-        print(json.dumps(result))
-        return 0
-        
     except Exception as e:
-        result = {
+        return {
             'status': 'error',
             'message': str(e)
         }
-        print(json.dumps(result))
-        return 1
+
+def serve(default_env_file):
+    """
+    Answer requests from stdin until it is closed
+    
+    Each line is a JSON object: {"op": "check"} or {"op": "update"} with
+    optional env_file, datacrunch_url, datacrunch_api_key and
+    huggingface_api_key fields. Each response is the JSON the matching
+    one-shot invocation would print, on its own line.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            request = json.loads(line)
+            op = request.get('op')
+            if op == 'check':
+                result = check_result()
+            elif op == 'update':
+                result = update_result(
+                    request.get('env_file', default_env_file),
+                    datacrunch_url=request.get('datacrunch_url'),
+                    datacrunch_api_key=request.get('datacrunch_api_key'),
+                    huggingface_api_key=request.get('huggingface_api_key')
+                )
+            else:
+                result = {'status': 'error', 'message': f"Unknown op: {op}"}
+        except (ValueError, AttributeError) as e:
+            result = {'status': 'error', 'message': f"Invalid request: {str(e)}"}
+        
+        print(json.dumps(result), flush=True)
+
+def main():
+    """Main function"""
+    args = parse_args()
+    
+    if args.serve:
+        serve(args.env_file)
+        return 0
+    
+    if args.check_only:
+        # Check and report current environment variables
+        print(json.dumps(check_result()))
+        return 0
+    
+    # Update .env file and report the result
+    result = update_result(
+        args.env_file,
+        datacrunch_url=args.datacrunch_url,
+        datacrunch_api_key=args.datacrunch_api_key,
+        huggingface_api_key=args.huggingface_api_key
+    )
+    print(json.dumps(result))
+    return 0 if result['status'] == 'ok' else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
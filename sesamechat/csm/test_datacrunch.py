@@ -8,15 +8,25 @@ import sys
 import json
 import argparse
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Import our API client generator
-from datacrunch_generator import load_api_client
+from datacrunch_generator import DataCrunchGenerator
+try:
+    from datacrunch_generator import load_api_client
+except ImportError:
+    # Not provided by datacrunch_generator; --texts-file mode works without it
+    load_api_client = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("test_datacrunch")
 
+# API settings from the process environment, read once at import
+_ENV = {key: os.environ.get(key) for key in ('DATACRUNCH_URL', 'DATACRUNCH_API_KEY', 'HUGGINGFACE_API_KEY')}
+
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Test DataCrunch and HuggingFace API integration')
@@ -39,9 +49,67 @@ def parse_args():
     parser.add_argument('--prefer', type=str, default='datacrunch', 
                         choices=['datacrunch', 'huggingface'],
                         help='Which service to try first')
+    parser.add_argument('--texts-file', type=str,
+                        help='File with one text per line to generate with DataCrunch; results are printed as JSON')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent generations in batch mode')
     
     return parser.parse_args()
 
+def run_one(generator, text, voice, output_path):
+    """
+    Generate one utterance with DataCrunch, save it and describe the outcome
+    
+    Returns:
+        Dictionary with the text, output path, audio size, duration and
+        generation time, or the error if generation failed
+    """
+    start = time.perf_counter()
+    try:
+        audio_data, duration = generator.generate_audio(text, voice=voice)
+        with open(output_path, 'wb') as f:
+            f.write(audio_data)
+    except Exception as e:
+        logger.error(f"Generation failed for {output_path}: {str(e)}")
+        return {'text': text, 'success': False, 'error': str(e)}
+    
+    return {
+        'text': text,
+        'success': True,
+        'path': output_path,
+        'bytes': len(audio_data),
+        'duration': duration,
+        'elapsed': time.perf_counter() - start
+    }
+
+def run_batch(args, output_path):
+    """
+    Generate every line of --texts-file concurrently and print one JSON report
+    
+    Requests go straight to DataCrunchGenerator, sharing one session and
+    token. Outputs are named after --output with the line number appended.
+    """
+    with open(args.texts_file, 'r') as f:
+        texts = [line.strip() for line in f.read().splitlines() if line.strip()]
+    
+    outputs = [str(output_path.with_name(f"{output_path.stem}_{i}{output_path.suffix}")) for i in range(len(texts))]
+    
+    generator = DataCrunchGenerator(api_key=args.api_key, api_url=args.datacrunch_url)
+    voice = "speaker_0" if args.speaker == 0 else "speaker_1"
+    
+    # Generation is network-bound, so threads are enough to overlap requests
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            results = list(executor.map(
+                lambda item: run_one(generator, item[0], voice, item[1]),
+                zip(texts, outputs)
+            ))
+    finally:
+        generator.close()
+    
+    sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    return 0 if all(r['success'] for r in results) else 1
+
 def main():
     """Test the API client with DataCrunch and HuggingFace"""
     args = parse_args()
@@ -51,9 +119,9 @@ def main():
     
     # Show config (masking API keys)
     print(f"Model ID: {args.model}")
-    print(f"DataCrunch URL: {args.datacrunch_url or os.environ.get('DATACRUNCH_URL') or 'Not configured'}")
-    print(f"DataCrunch API Key: {'*****' if args.api_key or os.environ.get('DATACRUNCH_API_KEY') else 'Not configured'}")
-    print(f"HuggingFace API Key: {'*****' if args.huggingface_api_key or os.environ.get('HUGGINGFACE_API_KEY') else 'Not configured'}")
+    print(f"DataCrunch URL: {args.datacrunch_url or _ENV['DATACRUNCH_URL'] or 'Not configured'}")
+    print(f"DataCrunch API Key: {'*****' if args.api_key or _ENV['DATACRUNCH_API_KEY'] else 'Not configured'}")
+    print(f"HuggingFace API Key: {'*****' if args.huggingface_api_key or _ENV['HUGGINGFACE_API_KEY'] else 'Not configured'}")
     print(f"Preferred Service: {args.prefer}")
     print(f"Test Text: '{args.text}'")
     print(f"Output Path: {args.output}")
@@ -65,6 +133,14 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
     
     try:
+        if args.texts_file:
+            print(f"Generating audio for {args.texts_file}...")
+            return run_batch(args, output_path)
+        
+        if load_api_client is None:
+            print("ERROR: datacrunch_generator provides no load_api_client; only --texts-file is supported.")
+            return 1
+        
         print("Initializing API client...")
         
         # Initialize the API client
@@ -88,13 +164,13 @@ def main():
         print("Generating audio...")
         
         # Generate audio
-        start_time = __import__('time').time()
+        start_time = time.perf_counter()
         result = client.generate(
             text=args.text,
             speaker=args.speaker,
             output_path=str(output_path)
         )
-        end_time = __import__('time').time()
+        end_time = time.perf_counter()
         
         # Show results
         print("Generation successful!")
@@ -0,0 +1,284 @@
+"""
+TTS Cache Module
+
+This module provides a small content-addressed on-disk cache for generated
+speech. Entries are keyed by a hash of everything that determines the audio
+(text, speaker, model), so repeated prompts can be served from disk instead
+of being synthesized and transcoded again.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# File locking is only available on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "shifitest_tts")
+)
+
+# Total size the cache may grow to before least recently used entries are evicted
+DEFAULT_SIZE_LIMIT = int(os.getenv("TTS_CACHE_SIZE_LIMIT", 512 << 20))
+
+
+def cache_key(*parts: Any) -> str:
+    """
+    Build a cache key from the values that determine the generated audio.
+
+    Args:
+        parts: Text, speaker, model and any other relevant settings
+
+    Returns:
+        str: Hex digest identifying the audio
+    """
+    return hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def _copy_into_place(src: str, dst: str) -> None:
+    """
+    Copy src to dst through a temporary file in dst's directory.
+
+    The rename is atomic, so a reader checking for dst never sees a
+    partially copied file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", suffix=os.path.splitext(dst)[1])
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class TTSCache:
+    """
+    Content-addressed cache of generated WAV/MP3 files.
+
+    File entries (see fetch/store) are stored as <key>.wav, an optional
+    <key>.mp3 and a <key>.json metadata file describing how the audio was
+    produced. Raw audio bytes (see get/put) are stored as <key>.audio.
+
+    Reads refresh an entry's modification time, and writes evict the least
+    recently used entries once the cache outgrows its size limit. The
+    directory is only scanned when a running size estimate passes the limit,
+    so build one instance per process and reuse it.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, size_limit: int = DEFAULT_SIZE_LIMIT):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cached audio, defaults to env var
+                TTS_CACHE_DIR or ~/.cache/shifitest_tts
+            size_limit: Maximum total size in bytes, defaults to env var
+                TTS_CACHE_SIZE_LIMIT or 512 MiB
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.size_limit = size_limit
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Estimated total size in bytes: measured by the last scan, plus what
+        # this instance wrote since. None until the first write scans.
+        # Other processes' writes are only seen at the next scan.
+        self._size: Optional[int] = None
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Serialize generation of one key across processes.
+
+        Concurrent requests for the same text wait for the first one to
+        finish and then hit the cache instead of all synthesizing it.
+        """
+        if fcntl is None:
+            yield
+            return
+
+        with open(self._path(key, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def fetch(self, key: str, wav_path: str, mp3_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Copy a cached entry to the requested output paths.
+
+        Args:
+            key: Cache key from cache_key()
+            wav_path: Where to place the cached WAV file
+            mp3_path: Where to place the cached MP3 file, if one is cached
+
+        Returns:
+            The entry's metadata, with "mp3Cached" set when the MP3 was
+            placed, or None on a cache miss
+        """
+        cached_wav = self._path(key, ".wav")
+        cached_meta = self._path(key, ".json")
+        if not (os.path.exists(cached_wav) and os.path.exists(cached_meta)):
+            return None
+
+        try:
+            with open(cached_meta, "r") as f:
+                metadata = json.load(f)
+
+            # Copy rather than hardlink: callers may later rewrite the output
+            # file in place, which must not alter the cached entry
+            _copy_into_place(cached_wav, wav_path)
+
+            cached_mp3 = self._path(key, ".mp3")
+            metadata["mp3Cached"] = bool(mp3_path and os.path.exists(cached_mp3))
+            if metadata["mp3Cached"]:
+                _copy_into_place(cached_mp3, mp3_path)
+
+            os.utime(cached_meta)
+            logger.info(f"TTS cache hit for {key}")
+            return metadata
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read TTS cache entry {key}: {str(e)}")
+            return None
+
+    def store(self, key: str, wav_path: str, mp3_path: Optional[str] = None,
+              metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Add generated files to the cache.
+
+        Files are staged under a temporary name and renamed into place, so
+        readers never see a partially written entry. The metadata file is
+        written last and marks the entry as complete.
+
+        Args:
+            key: Cache key from cache_key()
+            wav_path: Generated WAV file
+            mp3_path: Generated MP3 file, if any
+            metadata: Information about the generation (engine, duration, ...)
+        """
+        try:
+            files = [(wav_path, ".wav")]
+            if mp3_path and os.path.exists(mp3_path):
+                files.append((mp3_path, ".mp3"))
+
+            written = 0
+            for src, suffix in files:
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=suffix)
+                os.close(fd)
+                shutil.copyfile(src, tmp_path)
+                written += os.path.getsize(tmp_path)
+                os.replace(tmp_path, self._path(key, suffix))
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+            with os.fdopen(fd, "w") as f:
+                json.dump(metadata or {}, f)
+            os.replace(tmp_path, self._path(key, ".json"))
+        except OSError as e:
+            logger.warning(f"Failed to store TTS cache entry {key}: {str(e)}")
+            return
+
+        self._evict(written)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read cached audio bytes.
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            The cached audio, or None on a cache miss
+        """
+        path = self._path(key, ".audio")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        logger.debug(f"TTS cache hit for {key}")
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Cache audio bytes, replacing any existing entry atomically.
+
+        Args:
+            key: Cache key from cache_key()
+            data: Audio to cache
+        """
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".audio")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key, ".audio"))
+        except OSError as e:
+            logger.warning(f"Failed to store TTS cache entry {key}: {str(e)}")
+            return
+
+        self._evict(len(data))
+
+    def _evict(self, written: int) -> None:
+        """
+        Delete least recently used entries until the cache fits its size limit.
+
+        Args:
+            written: Bytes just added to the cache
+        """
+        if self._size is not None:
+            self._size += written
+            if self._size <= self.size_limit:
+                return
+
+        entries: Dict[str, Tuple[List[str], int, float]] = {}
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    key, suffix = os.path.splitext(entry.name)
+                    # Lock files are empty and may be held by another process
+                    if suffix == ".lock" or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    files, size, last_used = entries.get(key, ([], 0, 0.0))
+                    entries[key] = (files + [entry.path], size + stat.st_size, max(last_used, stat.st_mtime))
+                    total += stat.st_size
+        except OSError as e:
+            logger.warning(f"Failed to scan TTS cache: {str(e)}")
+            return
+
+        self._size = total
+        if total <= self.size_limit:
+            return
+
+        for key, (files, size, _) in sorted(entries.items(), key=lambda item: item[1][2]):
+            for path in files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            logger.debug(f"Evicted TTS cache entry {key}")
+            if total <= self.size_limit:
+                break
+        self._size = total
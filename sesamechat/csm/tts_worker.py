@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Persistent TTS worker for SesameAI
+
+Serves speech requests from one long-lived process, so the CSM model,
+pooled HTTP connections and OAuth tokens are loaded once instead of on
+every request as with the one-shot run_*.py scripts.
+
+Reads one JSON request per line on stdin and writes one JSON result per
+line to stdout, in order. Logs and warnings go to stderr.
+
+Request fields:
+    text: Text to convert to speech (required)
+    speaker: Speaker ID, 0=female, 1=male (default 0)
+    output: Output WAV path (required for the datacrunch engine)
+    engine: "csm" (default) or "datacrunch"
+    model: Model ID for the datacrunch engine
+    id: Optional request ID, echoed back in the result
+
+Usage:
+    python tts_worker.py < requests.jsonl
+"""
+
+import sys
+import json
+import traceback
+
+import run_csm
+import run_datacrunch
+
+
+def handle_request(request):
+    """
+    Generate speech for one request
+    
+    Args:
+        request: Parsed request object
+    
+    Returns:
+        Dictionary with success status and path or error, as printed by
+        the matching one-shot script
+    """
+    engine = request.get("engine", "csm")
+    
+    if engine == "csm":
+        return run_csm.generate_audio(
+            text=request["text"],
+            speaker_id=request.get("speaker", 0),
+            output_path=request.get("output")
+        )
+    elif engine == "datacrunch":
+        if not request.get("output"):
+            raise ValueError("output is required for the datacrunch engine")
+        return run_datacrunch.generate_speech_with_datacrunch(
+            text=request["text"],
+            output_path=request["output"],
+            speaker_id=request.get("speaker", 0),
+            model_id=request.get("model")
+        )
+    
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def main():
+    """
+    Serve requests from stdin until it is closed
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        request = {}
+        try:
+            request = json.loads(line)
+            result = handle_request(request)
+        except Exception as e:
+            traceback_str = traceback.format_exc()
+            print(f"Error handling request: {str(e)}\n{traceback_str}", file=sys.stderr)
+            result = {
+                "success": False,
+                "error": str(e)
+            }
+        
+        if isinstance(request, dict) and "id" in request:
+            result["id"] = request["id"]
+        
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()